@@ -1,25 +1,25 @@
 """HTTP 기반 MCP 서버 (다중 사용자 지원) + 웹 UI - MVP (쿠팡 + CJ대한통운)"""
+import asyncio
 import html
-import json
 import secrets
 import os
 import httpx
+import orjson
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Any, Optional
 
 from fastapi import FastAPI, Request, Response, Form, Cookie
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from auth import extract_credentials_auto, set_credentials, get_credentials, AUTH_HEADERS_SPEC
-from tools.orders import get_orders
-from tools.shipping import issue_invoice, register_invoice, process_orders
-from tools.config import check_config
 import database as db
 from email_service import send_verification_email
+from http_client import SSL_CONTEXT, TURNSTILE_TIMEOUT
 
 # Cloudflare Turnstile 설정
 TURNSTILE_SITE_KEY = os.environ.get("TURNSTILE_SITE_KEY", "")
@@ -33,7 +33,7 @@ session_flash: dict[str, dict] = {}
 pending_registrations: dict[str, dict] = {}
 
 # 레이트 리밋 (IP별 요청 시각 기록)
-_rate_limits: dict[str, list[float]] = defaultdict(list)
+_rate_limits: dict[str, deque[float]] = defaultdict(deque)
 
 
 MAX_RATE_LIMIT_KEYS = 10000
@@ -41,16 +41,18 @@ MAX_RATE_LIMIT_KEYS = 10000
 
 def _check_rate_limit(ip: str, max_requests: int = 5, window_seconds: int = 600) -> bool:
     """IP 기반 레이트 리밋. 제한 초과 시 False 반환."""
-    now = time.time()
+    now = time.monotonic()
     # 메모리 제한: 키가 너무 많으면 전체 초기화
     if len(_rate_limits) > MAX_RATE_LIMIT_KEYS:
         _rate_limits.clear()
     timestamps = _rate_limits[ip]
-    # 윈도우 밖의 오래된 기록 제거
-    _rate_limits[ip] = [t for t in timestamps if now - t < window_seconds]
-    if len(_rate_limits[ip]) >= max_requests:
+    # 윈도우 밖의 오래된 기록 제거 (시각 순으로 쌓이므로 앞에서부터 제거)
+    cutoff = now - window_seconds
+    while timestamps and timestamps[0] <= cutoff:
+        timestamps.popleft()
+    if len(timestamps) >= max_requests:
         return False
-    _rate_limits[ip].append(now)
+    timestamps.append(now)
     return True
 
 
@@ -86,25 +88,48 @@ def verify_csrf(session_id: Optional[str], token: str) -> bool:
     return secrets.compare_digest(expected, token)
 
 
+# Turnstile 검증용 공유 HTTP 클라이언트 (로그인/가입마다 TLS 연결을 새로 맺지 않도록 재사용)
+_turnstile_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_turnstile_client() -> httpx.AsyncClient:
+    global _turnstile_client
+    if _turnstile_client is None or _turnstile_client.is_closed:
+        _turnstile_client = httpx.AsyncClient(timeout=TURNSTILE_TIMEOUT, verify=SSL_CONTEXT)
+    return _turnstile_client
+
+
+async def _close_turnstile_client():
+    global _turnstile_client
+    if _turnstile_client is not None:
+        await _turnstile_client.aclose()
+        _turnstile_client = None
+
+
 async def verify_turnstile(token: str) -> bool:
     if not TURNSTILE_SECRET_KEY:
         return True
     if not token:
         return False
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://challenges.cloudflare.com/turnstile/v0/siteverify",
-                data={"secret": TURNSTILE_SECRET_KEY, "response": token}
-            )
-            return response.json().get("success", False)
+        response = await _get_turnstile_client().post(
+            "https://challenges.cloudflare.com/turnstile/v0/siteverify",
+            data={"secret": TURNSTILE_SECRET_KEY, "response": token}
+        )
+        return response.json().get("success", False)
     except Exception:
         return False
 
 
+# 정적 파일은 배포 전까지 바뀌지 않으므로 하루 캐시 (만료 후에는 StaticFiles의 ETag/Last-Modified로 304 재검증)
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+
+
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
+        if request.scope["path"].startswith("/static/"):
+            response.headers["Cache-Control"] = STATIC_CACHE_CONTROL
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["X-Frame-Options"] = "DENY"
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
@@ -120,31 +145,46 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 class CredentialsMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        if request.url.path.startswith("/mcp"):
+        # request.url은 접근 시 URL 객체를 새로 만들므로 scope의 경로를 한 번만 확인
+        is_mcp = request.scope["path"].startswith("/mcp")
+        if is_mcp:
             headers = dict(request.headers)
             credentials = extract_credentials_auto(headers)
             set_credentials(credentials)
         try:
             return await call_next(request)
         finally:
-            if request.url.path.startswith("/mcp"):
+            if is_mcp:
                 set_credentials(None)
 
 
+class ORJSONResponse(JSONResponse):
+    """orjson 기반 JSON 응답 (표준 json 대비 직렬화가 빠름)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app):
     from scheduler import start_scheduler, stop_scheduler
+    from http_client import close_http_client
     start_scheduler()
     yield
+    # 스케줄러는 대기 없이 종료(wait=False)하고, 외부 API 클라이언트는 동시에 정리
     stop_scheduler()
+    await asyncio.gather(
+        close_http_client(), _close_turnstile_client(), return_exceptions=True
+    )
 
 app = FastAPI(
     title="SoloSeller MCP Server",
     description="쿠팡 주문 관리 및 CJ대한통운 송장 자동화 MCP 서버",
     version="2.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 ALLOWED_ORIGINS = os.environ.get("ALLOWED_ORIGINS", "https://soloseller.cloud").split(",")
@@ -158,6 +198,8 @@ app.add_middleware(
 )
 app.add_middleware(CredentialsMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
+# 대시보드 HTML/주문 목록 JSON 압축 (작은 응답은 압축 비용이 더 커서 제외)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -211,11 +253,14 @@ BASE_STYLE = """
 """
 
 
-def render_page(title: str, content: str, user_id: Optional[int] = None) -> str:
+def render_page(title: str, content: str, user_id: Optional[int] = None, email: Optional[str] = None) -> str:
     nav = ""
     if user_id:
-        user = db.get_user_by_id(user_id)
-        email = html.escape(user["email"]) if user else ""
+        # 호출측에서 이미 이메일을 조회했다면 재조회하지 않음
+        if email is None:
+            user = db.get_user_by_id(user_id)
+            email = user["email"] if user else ""
+        email = html.escape(email)
         nav = f"""
         <div class="nav">
             <a href="/dashboard">대시보드</a>
@@ -297,32 +342,60 @@ MCP_TOOLS = [
 ]
 
 
+async def _tool_check_config(arguments: dict) -> dict:
+    from tools.config import check_config
+    return await check_config()
+
+
+async def _tool_get_orders(arguments: dict) -> dict:
+    from tools.orders import get_orders
+    return await get_orders(days=arguments.get("days", 7))
+
+
+async def _tool_issue_invoice(arguments: dict) -> dict:
+    from tools.shipping import issue_invoice
+    return await issue_invoice(
+        order_id=arguments["order_id"],
+        receiver_name=arguments["receiver_name"],
+        receiver_phone=arguments["receiver_phone"],
+        receiver_address=arguments["receiver_address"],
+        receiver_zipcode=arguments.get("receiver_zipcode", ""),
+        product_name=arguments.get("product_name", "상품")
+    )
+
+
+async def _tool_register_invoice(arguments: dict) -> dict:
+    from tools.shipping import register_invoice
+    return await register_invoice(
+        order_id=arguments["order_id"],
+        tracking_number=arguments["tracking_number"]
+    )
+
+
+async def _tool_process_orders(arguments: dict) -> dict:
+    from tools.shipping import process_orders
+    return await process_orders(
+        days=arguments.get("days", 7),
+        dry_run=arguments.get("dry_run", False)
+    )
+
+
+# 도구 이름 → 핸들러 (if/elif 비교 대신 dict 조회)
+_TOOL_HANDLERS = {
+    "check_config": _tool_check_config,
+    "get_orders": _tool_get_orders,
+    "issue_invoice": _tool_issue_invoice,
+    "register_invoice": _tool_register_invoice,
+    "process_orders": _tool_process_orders,
+}
+
+
 async def execute_tool(name: str, arguments: dict) -> dict:
-    """MCP Tool 실행"""
-    if name == "check_config":
-        return await check_config()
-    elif name == "get_orders":
-        return await get_orders(days=arguments.get("days", 7))
-    elif name == "issue_invoice":
-        return await issue_invoice(
-            order_id=arguments["order_id"],
-            receiver_name=arguments["receiver_name"],
-            receiver_phone=arguments["receiver_phone"],
-            receiver_address=arguments["receiver_address"],
-            receiver_zipcode=arguments.get("receiver_zipcode", ""),
-            product_name=arguments.get("product_name", "상품")
-        )
-    elif name == "register_invoice":
-        return await register_invoice(
-            order_id=arguments["order_id"],
-            tracking_number=arguments["tracking_number"]
-        )
-    elif name == "process_orders":
-        return await process_orders(
-            days=arguments.get("days", 7),
-            dry_run=arguments.get("dry_run", False)
-        )
-    return {"error": f"Unknown tool: {name}"}
+    """MCP Tool 실행 (도구 모듈은 첫 호출 시 로드해 기동 시간 단축)"""
+    handler = _TOOL_HANDLERS.get(name)
+    if handler is None:
+        return {"error": f"Unknown tool: {name}"}
+    return await handler(arguments)
 
 
 # ============ 기본 엔드포인트 ============
@@ -332,40 +405,42 @@ async def root():
     return {"name": "soloseller-mvp", "version": "2.0.0", "status": "running"}
 
 
+# 고정 응답은 모듈 로드 시 한 번만 구성
+MCP_INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {"tools": {"listChanged": False}},
+    "serverInfo": {"name": "soloseller-mvp", "version": "2.0.0"}
+}
+MCP_TOOLS_LIST_RESULT = {"tools": MCP_TOOLS}
+MCP_INFO = {
+    "name": "soloseller-mvp",
+    "description": "쿠팡 주문 관리 + CJ대한통운 송장 자동화",
+    "version": "2.0.0",
+    "protocol": "mcp",
+    "transport": "streamable-http",
+    "authentication": AUTH_HEADERS_SPEC,
+    "tools": [{"name": t["name"], "description": t["description"]} for t in MCP_TOOLS]
+}
+
+
 @app.get("/mcp/info")
 async def mcp_info():
-    return {
-        "name": "soloseller-mvp",
-        "description": "쿠팡 주문 관리 + CJ대한통운 송장 자동화",
-        "version": "2.0.0",
-        "protocol": "mcp",
-        "transport": "streamable-http",
-        "authentication": AUTH_HEADERS_SPEC,
-        "tools": [{"name": t["name"], "description": t["description"]} for t in MCP_TOOLS]
-    }
+    return MCP_INFO
 
 
 @app.get("/mcp")
 async def mcp_get():
-    return {
-        "jsonrpc": "2.0",
-        "result": {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {"tools": {"listChanged": False}},
-            "serverInfo": {"name": "soloseller-mvp", "version": "2.0.0"}
-        },
-        "id": None
-    }
+    return {"jsonrpc": "2.0", "result": MCP_INITIALIZE_RESULT, "id": None}
 
 
 @app.post("/mcp")
 async def mcp_endpoint(request: Request):
     try:
-        body = await request.json()
-    except Exception:
-        return Response(
-            content=json.dumps({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": None}),
-            media_type="application/json", status_code=400
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        return ORJSONResponse(
+            {"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": None},
+            status_code=400
         )
 
     jsonrpc_id = body.get("id")
@@ -374,33 +449,25 @@ async def mcp_endpoint(request: Request):
 
     try:
         if method == "initialize":
-            result = {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {"tools": {"listChanged": False}},
-                "serverInfo": {"name": "soloseller-mvp", "version": "2.0.0"}
-            }
+            result = MCP_INITIALIZE_RESULT
         elif method == "tools/list":
-            result = {"tools": MCP_TOOLS}
+            result = MCP_TOOLS_LIST_RESULT
         elif method == "tools/call":
             tool_result = await execute_tool(params.get("name", ""), params.get("arguments", {}))
-            result = {"content": [{"type": "text", "text": json.dumps(tool_result, ensure_ascii=False, default=str, indent=2)}]}
+            result = {"content": [{"type": "text", "text": orjson.dumps(tool_result, default=str, option=orjson.OPT_INDENT_2).decode()}]}
         elif method == "notifications/initialized":
             return Response(status_code=204)
         else:
-            return Response(
-                content=json.dumps({"jsonrpc": "2.0", "error": {"code": -32601, "message": f"Method not found: {method}"}, "id": jsonrpc_id}),
-                media_type="application/json"
+            return ORJSONResponse(
+                {"jsonrpc": "2.0", "error": {"code": -32601, "message": f"Method not found: {method}"}, "id": jsonrpc_id}
             )
 
-        return Response(
-            content=json.dumps({"jsonrpc": "2.0", "result": result, "id": jsonrpc_id}, ensure_ascii=False),
-            media_type="application/json"
-        )
+        return ORJSONResponse({"jsonrpc": "2.0", "result": result, "id": jsonrpc_id})
     except Exception as e:
         print(f"[MCP] Internal error: {e}")
-        return Response(
-            content=json.dumps({"jsonrpc": "2.0", "error": {"code": -32603, "message": "Internal server error"}, "id": jsonrpc_id}),
-            media_type="application/json", status_code=500
+        return ORJSONResponse(
+            {"jsonrpc": "2.0", "error": {"code": -32603, "message": "Internal server error"}, "id": jsonrpc_id},
+            status_code=500
         )
 
 
@@ -453,18 +520,19 @@ async def register_submit(request: Request, email: str = Form(...), password: st
     if password != password2:
         return RedirectResponse("/register?error=비밀번호가 일치하지 않습니다", status_code=303)
 
-    existing_user = db.get_user_by_email(email)
-    if existing_user:
+    if db.email_exists(email):
         return RedirectResponse("/register?error=이미 등록된 이메일입니다", status_code=303)
 
     code = db.create_verification_code(email, "register")
-    if not send_verification_email(email, code):
+    # SMTP 발송은 블로킹 I/O라 스레드에서 실행 (이벤트 루프 차단 방지)
+    if not await asyncio.to_thread(send_verification_email, email, code):
         return RedirectResponse("/register?error=인증 이메일 발송에 실패했습니다", status_code=303)
 
     if len(pending_registrations) >= 1000:
         pending_registrations.clear()
     reg_token = secrets.token_urlsafe(32)
-    pending_registrations[reg_token] = {"email": email, "password_hash": db.hash_password(password)}
+    password_hash = await db.run_in_bcrypt_pool(db.hash_password, password)
+    pending_registrations[reg_token] = {"email": email, "password_hash": password_hash}
 
     return RedirectResponse(f"/verify-email?token={reg_token}&email={email}", status_code=303)
 
@@ -525,7 +593,7 @@ async def resend_code(request: Request, token: str = "", email: str = ""):
     if token not in pending_registrations:
         return RedirectResponse("/register?error=유효하지 않은 요청입니다", status_code=303)
     code = db.create_verification_code(email, "register")
-    send_verification_email(email, code)
+    await asyncio.to_thread(send_verification_email, email, code)
     return RedirectResponse(f"/verify-email?token={token}&email={email}", status_code=303)
 
 
@@ -561,13 +629,13 @@ async def login_submit(request: Request, email: str = Form(...), password: str =
     if not await verify_turnstile(turnstile_token):
         return RedirectResponse("/login?error=로봇 확인에 실패했습니다", status_code=303)
 
-    user_id = db.authenticate_user(email, password)
-    if not user_id:
+    user = await db.run_in_bcrypt_pool(db.authenticate_login, email, password)
+    if not user:
         return RedirectResponse("/login?error=이메일 또는 비밀번호가 잘못되었습니다", status_code=303)
-    if not db.is_email_verified(email):
+    if not user["email_verified"]:
         return RedirectResponse("/login?error=이메일 인증이 필요합니다", status_code=303)
 
-    session_id = create_session(user_id)
+    session_id = create_session(user["id"])
     response = RedirectResponse("/dashboard", status_code=303)
     response.set_cookie("session", session_id, httponly=True, secure=True, samesite="lax", max_age=86400*30)
     return response
@@ -584,176 +652,85 @@ async def logout(session: Optional[str] = Cookie(None)):
 
 # ============ 웹 UI - 대시보드 ============
 
-@app.get("/dashboard", response_class=HTMLResponse)
-async def dashboard_page(session: Optional[str] = Cookie(None)):
-    user_id = get_session_user(session)
-    if not user_id:
-        return RedirectResponse("/login", status_code=303)
-
-    creds = db.get_user_credentials(user_id) or {}
-    coupang_ok = all(creds.get(k) for k in ["coupang_vendor_id", "coupang_access_key", "coupang_secret_key"])
-    cj_ok = all(creds.get(k) for k in ["cj_customer_id", "cj_biz_reg_num"])
-    sender_ok = all(creds.get(k) for k in ["sender_name", "sender_phone", "sender_address"])
-    all_ok = coupang_ok and cj_ok and sender_ok
-
-    auto = db.get_automation_settings(user_id) or {}
-    auto_enabled = "checked" if auto.get("enabled") else ""
-    auto_interval = auto.get("interval_minutes", 60)
-    auto_last_run = auto.get("last_run_at", "")
-    auto_last_result = auto.get("last_result", "")
-
-    def interval_selected(val):
-        return "selected" if auto_interval == val else ""
-
-    setup_msg = ""
-    if not all_ok:
-        setup_msg = '<div class="error" style="margin-top:12px;">설정을 완료해야 사용할 수 있습니다. <a href="/settings" style="color:#fca5a5;">설정하기 →</a></div>'
-
-    dis = "" if all_ok else "disabled style='opacity:0.4;pointer-events:none;'"
-
-    content = f"""
-    <!-- 연동 상태 -->
-    <div class="card">
-        <div style="display:flex;justify-content:space-between;align-items:center;">
-            <div class="field-group-title" style="margin:0;">연동 상태</div>
-            <span style="font-size:13px;color:{'#86efac' if all_ok else '#fca5a5'};">{'모두 연동됨' if all_ok else '설정 필요'}</span>
-        </div>
-        <div style="margin-top:12px;">
-            {''.join(f'<span style="display:inline-block;padding:4px 12px;border-radius:20px;font-size:13px;margin:4px;background:{chr(35)}14532d;color:{chr(35)}86efac;" >✓ {l}</span>' if ok else f'<span style="display:inline-block;padding:4px 12px;border-radius:20px;font-size:13px;margin:4px;background:{chr(35)}7f1d1d;color:{chr(35)}fca5a5;">✗ {l}</span>' for l, ok in [("쿠팡", coupang_ok), ("CJ대한통운", cj_ok), ("발송인", sender_ok)])}
-        </div>
-        {setup_msg}
-    </div>
+# 대시보드 스크립트 (정적 내용이라 요청마다 f-string으로 다시 만들지 않음)
+DASHBOARD_SCRIPT = """<script>
+    function esc(s) { const d=document.createElement('div'); d.textContent=s||''; return d.innerHTML; }
 
-    <!-- 자동화 -->
-    <div class="card" {dis}>
-        <div style="display:flex;justify-content:space-between;align-items:center;">
-            <div class="field-group-title" style="margin:0;">자동 처리</div>
-            <label style="display:flex;align-items:center;gap:8px;cursor:pointer;margin:0;">
-                <input type="checkbox" id="auto-toggle" {auto_enabled} onchange="toggleAuto()" style="width:18px;height:18px;">
-                <span style="font-size:13px;" id="auto-label">{('ON' if auto_enabled else 'OFF')}</span>
-            </label>
-        </div>
-        <div style="margin-top:12px;display:flex;gap:12px;align-items:center;flex-wrap:wrap;">
-            <select id="auto-interval" onchange="updateInterval()" style="padding:8px 12px;border-radius:8px;background:#0f0f0f;color:#fff;border:1px solid #333;font-size:13px;">
-                <option value="30" {interval_selected(30)}>30분마다</option>
-                <option value="60" {interval_selected(60)}>1시간마다</option>
-                <option value="120" {interval_selected(120)}>2시간마다</option>
-                <option value="240" {interval_selected(240)}>4시간마다</option>
-            </select>
-            <span style="font-size:12px;color:#888;" id="auto-status">
-                {'마지막: ' + html.escape(str(auto_last_run)[:16] + ' — ' + str(auto_last_result)) if auto_last_run else '아직 실행 기록 없음'}
-            </span>
-        </div>
-    </div>
-
-    <!-- 주문 조회 + 처리 -->
-    <div class="card" {dis}>
-        <div class="field-group-title">주문 처리</div>
-        <p style="color:#aaa;margin-bottom:16px;font-size:13px;">쿠팡 신규 주문 조회 → CJ대한통운 송장 발급 → 쿠팡 송장 등록</p>
-        <div id="orders-table" style="margin-bottom:16px;"><p style="color:#666;font-size:13px;">로딩 중...</p></div>
-        <div style="display:flex;gap:10px;flex-wrap:wrap;">
-            <button onclick="fetchOrders()" style="background:#333;">새로고침</button>
-            <button onclick="processConfirm()" style="background:#22c55e;" id="process-btn">일괄 처리</button>
-            <button onclick="testPrint()" style="background:#6366f1;">테스트 출력</button>
-        </div>
-    </div>
-
-    <!-- 처리 내역 -->
-    <div class="card">
-        <div class="field-group-title">처리 내역</div>
-        <div id="logs-area" style="font-size:13px;"><p style="color:#666;">로딩 중...</p></div>
-    </div>
-
-    <!-- 확인 모달 -->
-    <div id="confirm-modal" style="display:none;position:fixed;top:0;left:0;right:0;bottom:0;background:rgba(0,0,0,0.7);z-index:100;align-items:center;justify-content:center;">
-        <div style="background:#1a1a1a;border-radius:12px;padding:32px;max-width:400px;margin:auto;margin-top:20vh;text-align:center;">
-            <p style="font-size:16px;margin-bottom:8px;">일괄 처리를 시작합니다</p>
-            <p style="color:#aaa;font-size:13px;margin-bottom:24px;" id="confirm-msg">모든 신규 주문에 송장을 발급하고 쿠팡에 등록합니다.</p>
-            <div style="display:flex;gap:10px;justify-content:center;">
-                <button onclick="closeModal()" style="background:#333;">취소</button>
-                <button onclick="doProcess()" style="background:#22c55e;">확인</button>
-            </div>
-        </div>
-    </div>
-
-    <script>
-    function esc(s) {{ const d=document.createElement('div'); d.textContent=s||''; return d.innerHTML; }}
-
-    async function api(action, body={{}}) {{
-        const res = await fetch('/api/dashboard/' + action, {{
+    async function api(action, body={}) {
+        const res = await fetch('/api/dashboard/' + action, {
             method: 'POST',
-            headers: {{'Content-Type': 'application/json', 'X-Requested-With': 'SoloSeller'}},
+            headers: {'Content-Type': 'application/json', 'X-Requested-With': 'SoloSeller'},
             body: JSON.stringify(body)
-        }});
+        });
         return await res.json();
-    }}
+    }
 
     // 주문 테이블
-    function renderOrders(data) {{
+    function renderOrders(data) {
         const el = document.getElementById('orders-table');
-        if (!data.success && data.error) {{ el.innerHTML = '<div class="error">' + esc(data.error) + '</div>'; return; }}
+        if (!data.success && data.error) { el.innerHTML = '<div class="error">' + esc(data.error) + '</div>'; return; }
         const orders = data.orders || [];
-        if (orders.length === 0) {{ el.innerHTML = '<p style="color:#666;font-size:13px;">신규 주문이 없습니다.</p>'; return; }}
+        if (orders.length === 0) { el.innerHTML = '<p style="color:#666;font-size:13px;">신규 주문이 없습니다.</p>'; return; }
         let h = '<table style="width:100%;font-size:13px;border-collapse:collapse;"><tr style="color:#888;"><th style="text-align:left;padding:8px;">주문번호</th><th style="text-align:left;">수령인</th><th style="text-align:left;">상품</th></tr>';
-        orders.forEach(o => {{
+        orders.forEach(o => {
             const items = o.items || [];
             const pname = items.length > 0 ? (items[0].product_name || '상품') : '상품';
             h += '<tr style="border-top:1px solid #222;"><td style="padding:8px;font-family:monospace;font-size:12px;">' + esc(o.order_id||'') + '</td><td>' + esc(o.receiver_name||'') + '</td><td>' + esc(pname) + '</td></tr>';
-        }});
+        });
         h += '</table><p style="margin-top:8px;color:#888;font-size:12px;">' + orders.length + '건의 신규 주문</p>';
         el.innerHTML = h;
-    }}
+    }
 
-    async function fetchOrders() {{
+    async function fetchOrders(force) {
         document.getElementById('orders-table').innerHTML = '<p style="color:#666;font-size:13px;">조회 중...</p>';
-        renderOrders(await api('orders'));
-    }}
+        renderOrders(await api('orders', {force: !!force}));
+    }
 
     // 처리
-    function processConfirm() {{ document.getElementById('confirm-modal').style.display = 'flex'; }}
-    function closeModal() {{ document.getElementById('confirm-modal').style.display = 'none'; }}
+    function processConfirm() { document.getElementById('confirm-modal').style.display = 'flex'; }
+    function closeModal() { document.getElementById('confirm-modal').style.display = 'none'; }
 
     let lastResults = [];
-    async function doProcess() {{
+    async function doProcess() {
         closeModal();
         document.getElementById('process-btn').textContent = '처리 중...';
         document.getElementById('process-btn').disabled = true;
-        const data = await api('process', {{dry_run: false}});
+        const data = await api('process', {dry_run: false});
         document.getElementById('process-btn').textContent = '일괄 처리';
         document.getElementById('process-btn').disabled = false;
-        if (data.results) {{
+        if (data.results) {
             lastResults = data.results;
             let h = '<table style="width:100%;font-size:13px;"><tr style="color:#888;"><th style="text-align:left;padding:8px;">주문</th><th>송장번호</th><th>상태</th></tr>';
-            data.results.forEach(r => {{
+            data.results.forEach(r => {
                 const st = (r.status === '완료' || r.status === '테스트') ? '<span style="color:#86efac;">' + esc(r.status) + '</span>' : '<span style="color:#fca5a5;">' + esc(r.error || r.status) + '</span>';
                 h += '<tr style="border-top:1px solid #222;"><td style="padding:8px;font-size:12px;">' + esc(r.order_id) + '</td><td style="font-family:monospace;">' + esc(r.tracking_number||'-') + '</td><td>' + st + '</td></tr>';
-            }});
+            });
             h += '</table><p style="color:#888;font-size:12px;margin-top:8px;">총 ' + (data.total||0) + '건 | 성공 ' + (data.processed||0) + '건 | 실패 ' + (data.failed||0) + '건</p>';
             const printable = data.results.filter(r => r.tracking_number);
-            if (printable.length > 0) {{
+            if (printable.length > 0) {
                 h += '<button onclick="printLabels()" style="margin-top:12px;background:#2563eb;padding:10px 24px;">송장 출력 (' + printable.length + '건)</button>';
-            }}
+            }
             document.getElementById('orders-table').innerHTML = h;
             // 송장번호가 있으면 자동으로 출력 창 열기
-            if (printable.length > 0) {{
+            if (printable.length > 0) {
                 printLabels();
-            }}
-        }} else {{
+            }
+        } else {
             document.getElementById('orders-table').innerHTML = '<p style="color:#888;font-size:13px;">' + esc(data.message || '완료') + '</p>';
-        }}
+        }
         loadLogs();
-    }}
+    }
 
-    function printLabels() {{
+    function printLabels() {
         const printable = lastResults.filter(r => r.tracking_number);
         if (printable.length === 0) return;
         const w = window.open('', '_blank');
-        if (!w) {{ alert('팝업이 차단되었습니다. 팝업을 허용해주세요.'); return; }}
-        const e = s => {{ const d=document.createElement('div'); d.textContent=s||''; return d.innerHTML; }};
+        if (!w) { alert('팝업이 차단되었습니다. 팝업을 허용해주세요.'); return; }
+        const e = s => { const d=document.createElement('div'); d.textContent=s||''; return d.innerHTML; };
         let labels = '';
         const today = new Date();
         const dateStr = today.getFullYear() + '.' + String(today.getMonth()+1).padStart(2,'0') + '.' + String(today.getDate()).padStart(2,'0');
-        printable.forEach((r, idx) => {{
+        printable.forEach((r, idx) => {
             const rc = e(r.routing_code||'');
             const bn = e(r.branch_name||'');
             const nm = e(r.receiver_name||'');
@@ -762,92 +739,92 @@ async def dashboard_page(session: Optional[str] = Cookie(None)):
             const cleaned = addr.replace(/\\s*\\[.*?\\]/g,'').replace(/\\s*\\(.*?\\)/g,'');
             const pp = cleaned.split(/\\s+/);
             let di=pp.length;
-            for(let i=pp.length-1;i>=0;i--){{if(/\\d+[동호층]|아파트|빌라|오피스텔|타워|빌딩/.test(pp[i])){{di=i;}}else if(di<pp.length)break;}}
+            for(let i=pp.length-1;i>=0;i--){if(/\\d+[동호층]|아파트|빌라|오피스텔|타워|빌딩/.test(pp[i])){di=i;}else if(di<pp.length)break;}
             const detail = di<pp.length ? pp.slice(di).join(' ') : nm;
             labels += `
             <div class="L">
                 <!-- 1행: 바코드 + 운송장번호 + 날짜 (용지에 "운송장번호" 라벨, 1588-1255 이미 있음) -->
-                <svg class="B1" data-value="${{e(r.tracking_number)}}"></svg>
-                <span class="TN">${{e(r.tracking_number)}}</span>
-                <span class="DT">${{dateStr}}</span>
+                <svg class="B1" data-value="${e(r.tracking_number)}"></svg>
+                <span class="TN">${e(r.tracking_number)}</span>
+                <span class="DT">${dateStr}</span>
                 <span class="QT">1/1</span>
                 <!-- 2행: 분류코드 + 바코드 -->
-                <svg class="B2" data-value="${{e(r.tracking_number)}}"></svg>
-                <span class="RC">${{rc}}</span>
+                <svg class="B2" data-value="${e(r.tracking_number)}"></svg>
+                <span class="RC">${rc}</span>
                 <!-- 3행: 받는분 정보 (용지에 "받는분" 태그 이미 있음) -->
-                <span class="RN">${{masked}} &nbsp; ${{e(r.receiver_phone)}}</span>
-                <span class="RA">${{addr}}</span>
-                <span class="RD">${{detail}}</span>
+                <span class="RN">${masked} &nbsp; ${e(r.receiver_phone)}</span>
+                <span class="RA">${addr}</span>
+                <span class="RD">${detail}</span>
                 <!-- 4행: 보내는분 (용지에 "보내는분" 태그 이미 있음) -->
-                <span class="SN">${{e(r.sender_name)}} &nbsp; ${{e(r.sender_phone)}}</span>
-                <span class="SA">${{e(r.sender_address)}}</span>
+                <span class="SN">${e(r.sender_name)} &nbsp; ${e(r.sender_phone)}</span>
+                <span class="SA">${e(r.sender_address)}</span>
                 <!-- 수량/운임/정산 값만 (헤더는 용지에 있음) -->
                 <span class="V1">극소C 1</span>
                 <span class="V2">0</span>
                 <span class="V3">선불</span>
                 <!-- 5행: 상품 -->
-                <span class="PD">${{e(r.product_name)}}</span>
+                <span class="PD">${e(r.product_name)}</span>
                 <span class="PQ">1</span>
                 <!-- 7행: 영업소 + 바코드 -->
-                <span class="BN">${{bn ? '대한통운 - '+bn : '대한통운'}}</span>
-                <svg class="B3" data-value="${{e(r.tracking_number)}}"></svg>
-                <span class="BT">${{e(r.tracking_number)}}</span>
+                <span class="BN">${bn ? '대한통운 - '+bn : '대한통운'}</span>
+                <svg class="B3" data-value="${e(r.tracking_number)}"></svg>
+                <span class="BT">${e(r.tracking_number)}</span>
             </div>`;
-        }});
+        });
         w.document.write(`<!DOCTYPE html><html><head><meta charset="utf-8"><title>송장 출력</title>
         <style>
-            @page{{size:100mm 82mm;margin:0}}
-            *{{margin:0;padding:0;box-sizing:border-box}}
-            body{{font-family:'Malgun Gothic','맑은 고딕',sans-serif;margin:0;padding:0}}
-            .L{{
+            @page{size:100mm 82mm;margin:0}
+            *{margin:0;padding:0;box-sizing:border-box}
+            body{font-family:'Malgun Gothic','맑은 고딕',sans-serif;margin:0;padding:0}
+            .L{
                 width:100mm;height:82mm;
                 page-break-after:always;
                 position:relative;
                 overflow:hidden;
-            }}
+            }
             /* 1행: 바코드+운송장번호+날짜 (y:0~7mm) */
-            .B1{{position:absolute;left:12mm;top:1mm;height:5mm}}
-            .TN{{position:absolute;left:42mm;top:1.5mm;font-size:8pt;font-weight:bold;font-family:'Courier New',monospace}}
-            .DT{{position:absolute;left:68mm;top:2mm;font-size:6pt}}
-            .QT{{position:absolute;left:78mm;top:1.5mm;font-size:6pt;font-weight:bold}}
+            .B1{position:absolute;left:12mm;top:1mm;height:5mm}
+            .TN{position:absolute;left:42mm;top:1.5mm;font-size:8pt;font-weight:bold;font-family:'Courier New',monospace}
+            .DT{position:absolute;left:68mm;top:2mm;font-size:6pt}
+            .QT{position:absolute;left:78mm;top:1.5mm;font-size:6pt;font-weight:bold}
             /* 2행: 분류코드 (y:7~21mm) */
-            .B2{{position:absolute;left:3mm;top:8mm;height:11mm}}
-            .RC{{position:absolute;left:30mm;top:8mm;font-size:24pt;font-weight:900;letter-spacing:1px}}
+            .B2{position:absolute;left:3mm;top:8mm;height:11mm}
+            .RC{position:absolute;left:30mm;top:8mm;font-size:24pt;font-weight:900;letter-spacing:1px}
             /* 3행: 받는분 (y:21~55mm) - 태그는 용지에 있으므로 왼쪽 여백 확보 */
-            .RN{{position:absolute;left:7mm;top:22mm;font-size:7.5pt;font-weight:bold}}
-            .RA{{position:absolute;left:7mm;top:26mm;font-size:6.5pt;color:#333;width:75mm;line-height:1.2}}
-            .RD{{position:absolute;left:7mm;top:33mm;font-size:14pt;font-weight:900;width:75mm;line-height:1.15}}
+            .RN{position:absolute;left:7mm;top:22mm;font-size:7.5pt;font-weight:bold}
+            .RA{position:absolute;left:7mm;top:26mm;font-size:6.5pt;color:#333;width:75mm;line-height:1.2}
+            .RD{position:absolute;left:7mm;top:33mm;font-size:14pt;font-weight:900;width:75mm;line-height:1.15}
             /* 4행: 보내는분 (y:55~67mm) */
-            .SN{{position:absolute;left:7mm;top:53mm;font-size:6pt}}
-            .SA{{position:absolute;left:7mm;top:56.5mm;font-size:5.5pt;color:#555;width:55mm}}
+            .SN{position:absolute;left:7mm;top:53mm;font-size:6pt}
+            .SA{position:absolute;left:7mm;top:56.5mm;font-size:5.5pt;color:#555;width:55mm}
             /* 수량/운임/정산 값 (용지에 헤더 있음, 값만 채움) */
-            .V1{{position:absolute;left:67mm;top:54mm;font-size:5.5pt;text-align:center}}
-            .V2{{position:absolute;left:78mm;top:54mm;font-size:5.5pt;text-align:center}}
-            .V3{{position:absolute;left:88mm;top:54mm;font-size:5.5pt;text-align:center}}
+            .V1{position:absolute;left:67mm;top:54mm;font-size:5.5pt;text-align:center}
+            .V2{position:absolute;left:78mm;top:54mm;font-size:5.5pt;text-align:center}
+            .V3{position:absolute;left:88mm;top:54mm;font-size:5.5pt;text-align:center}
             /* 5행: 상품 (y:67~72mm) */
-            .PD{{position:absolute;left:3mm;top:61mm;font-size:5.5pt;width:85mm}}
-            .PQ{{position:absolute;left:92mm;top:61mm;font-size:5.5pt}}
+            .PD{position:absolute;left:3mm;top:61mm;font-size:5.5pt;width:85mm}
+            .PQ{position:absolute;left:92mm;top:61mm;font-size:5.5pt}
             /* 6행: 주의사항 - 용지에 이미 있으므로 출력 안함 */
             /* 7행: 하단 영업소+바코드 (y:76~82mm) */
-            .BN{{position:absolute;left:3mm;top:74mm;font-size:6.5pt;font-weight:bold}}
-            .B3{{position:absolute;left:40mm;top:74.5mm;height:5mm}}
-            .BT{{position:absolute;left:82mm;top:75mm;font-size:5pt;font-family:'Courier New',monospace}}
-            @media screen{{.L{{border:1px solid #ccc}}}}
-            @media print{{.L{{border:none}}}}
+            .BN{position:absolute;left:3mm;top:74mm;font-size:6.5pt;font-weight:bold}
+            .B3{position:absolute;left:40mm;top:74.5mm;height:5mm}
+            .BT{position:absolute;left:82mm;top:75mm;font-size:5pt;font-family:'Courier New',monospace}
+            @media screen{.L{border:1px solid #ccc}}
+            @media print{.L{border:none}}
         </style>
         <script src="/static/jsbarcode.min.js"><\\/script>
-        </head><body>${{labels}}
+        </head><body>${labels}
         <script>
-            document.querySelectorAll('.B1').forEach(s=>{{JsBarcode(s,s.dataset.value,{{format:'CODE128',width:1,height:16,displayValue:false,margin:0}})}});
-            document.querySelectorAll('.B2').forEach(s=>{{JsBarcode(s,s.dataset.value,{{format:'CODE128',width:1,height:30,displayValue:false,margin:0}})}});
-            document.querySelectorAll('.B3').forEach(s=>{{JsBarcode(s,s.dataset.value,{{format:'CODE128',width:1,height:16,displayValue:false,margin:0}})}});
+            document.querySelectorAll('.B1').forEach(s=>{JsBarcode(s,s.dataset.value,{format:'CODE128',width:1,height:16,displayValue:false,margin:0})});
+            document.querySelectorAll('.B2').forEach(s=>{JsBarcode(s,s.dataset.value,{format:'CODE128',width:1,height:30,displayValue:false,margin:0})});
+            document.querySelectorAll('.B3').forEach(s=>{JsBarcode(s,s.dataset.value,{format:'CODE128',width:1,height:16,displayValue:false,margin:0})});
             setTimeout(()=>window.print(),500);
         <\\/script></body></html>`);
         w.document.close();
-    }}
+    }
 
-    function testPrint() {{
-        lastResults = [{{
+    function testPrint() {
+        lastResults = [{
             order_id: 'TEST-20260320-001',
             tracking_number: '6970-4079-7621',
             receiver_name: '최민수',
@@ -862,45 +839,141 @@ async def dashboard_page(session: Optional[str] = Cookie(None)):
             routing_code: '2 T25 -1b',
             branch_name: '용두중앙-B47-6구역',
             status: '테스트',
-        }}];
+        }];
         printLabels();
-    }}
+    }
 
     // 자동화
-    async function toggleAuto() {{
+    async function toggleAuto() {
         const enabled = document.getElementById('auto-toggle').checked;
         const interval = parseInt(document.getElementById('auto-interval').value);
         document.getElementById('auto-label').textContent = enabled ? 'ON' : 'OFF';
-        await api('automation', {{enabled, interval_minutes: interval}});
-    }}
-    async function updateInterval() {{
+        await api('automation', {enabled, interval_minutes: interval});
+    }
+    async function updateInterval() {
         const enabled = document.getElementById('auto-toggle').checked;
         const interval = parseInt(document.getElementById('auto-interval').value);
-        await api('automation', {{enabled, interval_minutes: interval}});
-    }}
+        await api('automation', {enabled, interval_minutes: interval});
+    }
 
     // 로그
-    async function loadLogs() {{
-        const data = await api('logs');
+    let logs = [];
+    async function loadLogs(beforeId) {
+        const data = await api('logs', beforeId ? {before_id: beforeId} : {});
         const el = document.getElementById('logs-area');
-        const logs = data.logs || [];
-        if (logs.length === 0) {{ el.innerHTML = '<p style="color:#666;">아직 처리 내역이 없습니다.</p>'; return; }}
+        logs = beforeId ? logs.concat(data.logs || []) : (data.logs || []);
+        if (logs.length === 0) { el.innerHTML = '<p style="color:#666;">아직 처리 내역이 없습니다.</p>'; return; }
         let h = '<table style="width:100%;font-size:12px;border-collapse:collapse;"><tr style="color:#888;"><th style="text-align:left;padding:6px;">시간</th><th>유형</th><th>건수</th><th>결과</th></tr>';
-        logs.forEach(l => {{
+        logs.forEach(l => {
             const t = l.trigger_type === 'auto' ? '🤖 자동' : '👆 수동';
             const color = l.failed > 0 ? '#fca5a5' : '#86efac';
             h += '<tr style="border-top:1px solid #222;"><td style="padding:6px;">' + esc((l.created_at||'').substring(0,16)) + '</td><td>' + t + '</td><td>' + l.total_orders + '건</td><td style="color:' + color + ';">성공 ' + l.processed + ' / 실패 ' + l.failed + '</td></tr>';
-        }});
+        });
         h += '</table>';
+        if (data.next_cursor) h += '<button onclick="loadLogs(' + data.next_cursor + ')" style="margin-top:8px;background:#333;">더 보기</button>';
         el.innerHTML = h;
-    }}
+    }
 
     // 페이지 로드 시 주문 + 로그 조회
     fetchOrders();
     loadLogs();
-    </script>
+    </script>"""
+
+
+@app.get("/dashboard", response_class=HTMLResponse)
+async def dashboard_page(session: Optional[str] = Cookie(None)):
+    user_id = get_session_user(session)
+    if not user_id:
+        return RedirectResponse("/login", status_code=303)
+
+    data = db.get_dashboard_data(user_id) or {}
+    coupang_ok = all(data.get(k) for k in ["coupang_vendor_id", "coupang_access_key", "coupang_secret_key"])
+    cj_ok = all(data.get(k) for k in ["cj_customer_id", "cj_biz_reg_num"])
+    sender_ok = all(data.get(k) for k in ["sender_name", "sender_phone", "sender_address"])
+    all_ok = coupang_ok and cj_ok and sender_ok
+
+    auto_enabled = "checked" if data.get("enabled") else ""
+    auto_interval = data.get("interval_minutes", 60)
+    auto_last_run = data.get("last_run_at", "")
+    auto_last_result = data.get("last_result", "")
+
+    def interval_selected(val):
+        return "selected" if auto_interval == val else ""
+
+    setup_msg = ""
+    if not all_ok:
+        setup_msg = '<div class="error" style="margin-top:12px;">설정을 완료해야 사용할 수 있습니다. <a href="/settings" style="color:#fca5a5;">설정하기 →</a></div>'
+
+    dis = "" if all_ok else "disabled style='opacity:0.4;pointer-events:none;'"
+
+    content = f"""
+    <!-- 연동 상태 -->
+    <div class="card">
+        <div style="display:flex;justify-content:space-between;align-items:center;">
+            <div class="field-group-title" style="margin:0;">연동 상태</div>
+            <span style="font-size:13px;color:{'#86efac' if all_ok else '#fca5a5'};">{'모두 연동됨' if all_ok else '설정 필요'}</span>
+        </div>
+        <div style="margin-top:12px;">
+            {''.join(f'<span style="display:inline-block;padding:4px 12px;border-radius:20px;font-size:13px;margin:4px;background:{chr(35)}14532d;color:{chr(35)}86efac;" >✓ {l}</span>' if ok else f'<span style="display:inline-block;padding:4px 12px;border-radius:20px;font-size:13px;margin:4px;background:{chr(35)}7f1d1d;color:{chr(35)}fca5a5;">✗ {l}</span>' for l, ok in [("쿠팡", coupang_ok), ("CJ대한통운", cj_ok), ("발송인", sender_ok)])}
+        </div>
+        {setup_msg}
+    </div>
+
+    <!-- 자동화 -->
+    <div class="card" {dis}>
+        <div style="display:flex;justify-content:space-between;align-items:center;">
+            <div class="field-group-title" style="margin:0;">자동 처리</div>
+            <label style="display:flex;align-items:center;gap:8px;cursor:pointer;margin:0;">
+                <input type="checkbox" id="auto-toggle" {auto_enabled} onchange="toggleAuto()" style="width:18px;height:18px;">
+                <span style="font-size:13px;" id="auto-label">{('ON' if auto_enabled else 'OFF')}</span>
+            </label>
+        </div>
+        <div style="margin-top:12px;display:flex;gap:12px;align-items:center;flex-wrap:wrap;">
+            <select id="auto-interval" onchange="updateInterval()" style="padding:8px 12px;border-radius:8px;background:#0f0f0f;color:#fff;border:1px solid #333;font-size:13px;">
+                <option value="30" {interval_selected(30)}>30분마다</option>
+                <option value="60" {interval_selected(60)}>1시간마다</option>
+                <option value="120" {interval_selected(120)}>2시간마다</option>
+                <option value="240" {interval_selected(240)}>4시간마다</option>
+            </select>
+            <span style="font-size:12px;color:#888;" id="auto-status">
+                {'마지막: ' + html.escape(str(auto_last_run)[:16] + ' — ' + str(auto_last_result)) if auto_last_run else '아직 실행 기록 없음'}
+            </span>
+        </div>
+    </div>
+
+    <!-- 주문 조회 + 처리 -->
+    <div class="card" {dis}>
+        <div class="field-group-title">주문 처리</div>
+        <p style="color:#aaa;margin-bottom:16px;font-size:13px;">쿠팡 신규 주문 조회 → CJ대한통운 송장 발급 → 쿠팡 송장 등록</p>
+        <div id="orders-table" style="margin-bottom:16px;"><p style="color:#666;font-size:13px;">로딩 중...</p></div>
+        <div style="display:flex;gap:10px;flex-wrap:wrap;">
+            <button onclick="fetchOrders(true)" style="background:#333;">새로고침</button>
+            <button onclick="processConfirm()" style="background:#22c55e;" id="process-btn">일괄 처리</button>
+            <button onclick="testPrint()" style="background:#6366f1;">테스트 출력</button>
+        </div>
+    </div>
+
+    <!-- 처리 내역 -->
+    <div class="card">
+        <div class="field-group-title">처리 내역</div>
+        <div id="logs-area" style="font-size:13px;"><p style="color:#666;">로딩 중...</p></div>
+    </div>
+
+    <!-- 확인 모달 -->
+    <div id="confirm-modal" style="display:none;position:fixed;top:0;left:0;right:0;bottom:0;background:rgba(0,0,0,0.7);z-index:100;align-items:center;justify-content:center;">
+        <div style="background:#1a1a1a;border-radius:12px;padding:32px;max-width:400px;margin:auto;margin-top:20vh;text-align:center;">
+            <p style="font-size:16px;margin-bottom:8px;">일괄 처리를 시작합니다</p>
+            <p style="color:#aaa;font-size:13px;margin-bottom:24px;" id="confirm-msg">모든 신규 주문에 송장을 발급하고 쿠팡에 등록합니다.</p>
+            <div style="display:flex;gap:10px;justify-content:center;">
+                <button onclick="closeModal()" style="background:#333;">취소</button>
+                <button onclick="doProcess()" style="background:#22c55e;">확인</button>
+            </div>
+        </div>
+    </div>
+
+    {DASHBOARD_SCRIPT}
     """
-    return HTMLResponse(render_page("대시보드", content, user_id))
+    return HTMLResponse(render_page("대시보드", content, user_id, data.get("email")))
 
 
 def _dashboard_auth(request: Request, session: Optional[str]):
@@ -915,34 +988,46 @@ def _dashboard_auth(request: Request, session: Optional[str]):
 
 def _load_user_creds(user_id: int):
     """사용자 인증 정보 로드 + ContextVar 설정"""
-    from auth import UserCredentials, set_credentials
-    creds_dict = db.get_user_credentials(user_id) or {}
-    creds = UserCredentials(
-        coupang_vendor_id=creds_dict.get("coupang_vendor_id"),
-        coupang_access_key=creds_dict.get("coupang_access_key"),
-        coupang_secret_key=creds_dict.get("coupang_secret_key"),
-        cj_customer_id=creds_dict.get("cj_customer_id"),
-        cj_biz_reg_num=creds_dict.get("cj_biz_reg_num"),
-        sender_name=creds_dict.get("sender_name"),
-        sender_phone=creds_dict.get("sender_phone"),
-        sender_zipcode=creds_dict.get("sender_zipcode"),
-        sender_address=creds_dict.get("sender_address"),
-    )
+    from auth import credentials_from_db_row, set_credentials
+    creds = credentials_from_db_row(db.get_user_credentials(user_id) or {})
     set_credentials(creds)
     return creds
 
 
+# 대시보드 주문 조회 결과 캐시 (사용자별, 페이지 재진입 시 쿠팡 API 재호출 생략)
+DASHBOARD_ORDERS_TTL_SECONDS = 30
+MAX_DASHBOARD_ORDERS_CACHE = 1000
+_dashboard_orders_cache: dict[int, tuple[float, dict]] = {}
+
+
 @app.post("/api/dashboard/orders")
 async def api_dashboard_orders(request: Request, session: Optional[str] = Cookie(None)):
     user_id, err = _dashboard_auth(request, session)
     if err:
         return err
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    force = bool(body.get("force")) if isinstance(body, dict) else False
+
+    now = time.monotonic()
+    cached = _dashboard_orders_cache.get(user_id)
+    if cached and not force and cached[0] > now:
+        return cached[1]
+
     from auth import set_credentials
+    from tools.orders import get_orders
     try:
         _load_user_creds(user_id)
-        return await get_orders(days=7)
+        result = await get_orders(days=7)
     finally:
         set_credentials(None)
+    if result.get("success"):
+        if len(_dashboard_orders_cache) >= MAX_DASHBOARD_ORDERS_CACHE:
+            _dashboard_orders_cache.clear()
+        _dashboard_orders_cache[user_id] = (now + DASHBOARD_ORDERS_TTL_SECONDS, result)
+    return result
 
 
 @app.post("/api/dashboard/process")
@@ -956,9 +1041,13 @@ async def api_dashboard_process(request: Request, session: Optional[str] = Cooki
         return {"success": False, "error": "잘못된 요청입니다."}
     dry_run = body.get("dry_run", True)
     from auth import set_credentials
+    from tools.shipping import process_orders
     try:
         _load_user_creds(user_id)
         result = await process_orders(days=7, dry_run=dry_run)
+        if not dry_run:
+            # 처리 후 주문 상태가 바뀌므로 캐시된 주문 목록 폐기
+            _dashboard_orders_cache.pop(user_id, None)
         if not dry_run and result.get("total", 0) > 0:
             db.create_processing_log(
                 user_id=user_id,
@@ -966,7 +1055,7 @@ async def api_dashboard_process(request: Request, session: Optional[str] = Cooki
                 total=result.get("total", 0),
                 processed=result.get("processed", 0),
                 failed=result.get("failed", 0),
-                result_json=json.dumps(result.get("results", []), ensure_ascii=False),
+                result_json=orjson.dumps(result.get("results", []), default=str).decode(),
             )
         return result
     finally:
@@ -1001,13 +1090,25 @@ async def api_get_automation(request: Request, session: Optional[str] = Cookie(N
     return {"success": True, **(settings or {"enabled": False, "interval_minutes": 60})}
 
 
+LOGS_PAGE_SIZE = 20
+
+
 @app.post("/api/dashboard/logs")
 async def api_dashboard_logs(request: Request, session: Optional[str] = Cookie(None)):
     user_id, err = _dashboard_auth(request, session)
     if err:
         return err
-    logs = db.get_processing_logs(user_id, limit=20)
-    return {"success": True, "logs": logs}
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    before_id = body.get("before_id") if isinstance(body, dict) else None
+    if not isinstance(before_id, int):
+        before_id = None
+    logs = db.get_processing_logs(user_id, limit=LOGS_PAGE_SIZE, before_id=before_id)
+    # 한 페이지가 가득 찼을 때만 다음 커서 제공 (마지막 로그 id 기준 keyset 페이지네이션)
+    next_cursor = logs[-1]["id"] if len(logs) == LOGS_PAGE_SIZE else None
+    return {"success": True, "logs": logs, "next_cursor": next_cursor}
 
 
 # ============ 웹 UI - API 설정 ============
@@ -1068,6 +1169,7 @@ async def settings_submit(request: Request, session: Optional[str] = Cookie(None
         return RedirectResponse("/settings", status_code=303)
     credentials = {k: v for k, v in form.items() if k != "csrf_token"}
     db.update_user_credentials(user_id, credentials)
+    _dashboard_orders_cache.pop(user_id, None)
     return RedirectResponse("/settings?success=저장되었습니다", status_code=303)
 
 
@@ -1096,12 +1198,13 @@ async def tokens_page(session: Optional[str] = Cookie(None)):
         </div>
         """
 
-    token_list = ""
+    csrf_token = get_csrf_token(session)
+    token_items = []
     for t in tokens:
         status = "활성" if t["is_active"] else "비활성"
         status_color = "#86efac" if t["is_active"] else "#fca5a5"
         last_used = t["last_used_at"] or "사용 안 함"
-        token_list += f"""
+        token_items.append(f"""
         <div class="token-item">
             <div>
                 <div class="token-name">{html.escape(t["name"])}</div>
@@ -1110,13 +1213,14 @@ async def tokens_page(session: Optional[str] = Cookie(None)):
             <div>
                 <span style="color: {status_color}; margin-right: 10px;">{status}</span>
                 <form method="post" action="/tokens/delete" style="display: inline;">
-                    <input type="hidden" name="csrf_token" value="{get_csrf_token(session)}">
+                    <input type="hidden" name="csrf_token" value="{csrf_token}">
                     <input type="hidden" name="token_id" value="{t["id"]}">
                     <button type="submit" class="btn btn-danger" style="padding: 6px 12px; font-size: 12px;">삭제</button>
                 </form>
             </div>
         </div>
-        """
+        """)
+    token_list = "".join(token_items)
 
     if not tokens:
         token_list = '<p style="color: #888; text-align: center; padding: 20px;">생성된 토큰이 없습니다</p>'
@@ -1126,7 +1230,7 @@ async def tokens_page(session: Optional[str] = Cookie(None)):
     <div class="card">
         <h2 style="margin-top: 0;">새 토큰 생성</h2>
         <form method="post" action="/tokens/create">
-            <input type="hidden" name="csrf_token" value="{get_csrf_token(session)}">
+            <input type="hidden" name="csrf_token" value="{csrf_token}">
             <label>토큰 이름 (선택)</label>
             <input type="text" name="name" placeholder="예: Claude Desktop용">
             <button type="submit">토큰 생성</button>
@@ -1175,4 +1279,7 @@ async def delete_token_submit(request: Request, session: Optional[str] = Cookie(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8082)
+    from log_config import configure_logging
+    from server import install_uvloop
+    configure_logging()
+    uvicorn.run(app, host="0.0.0.0", port=8082, loop="uvloop" if install_uvloop() else "asyncio")
@@ -1,11 +1,11 @@
 """다중 사용자 인증 모듈 - MVP (쿠팡 + CJ대한통운)"""
 from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 from urllib.parse import unquote
 
 
-@dataclass
+@dataclass(slots=True)
 class UserCredentials:
     """사용자별 인증 정보"""
 
@@ -52,8 +52,28 @@ def set_credentials(credentials):
     return _credentials.set(credentials)
 
 
+# 자격증명 헤더가 하나도 없는 요청에 공유하는 빈 인증 정보 (읽기 전용)
+_EMPTY_CREDENTIALS = UserCredentials()
+
+# 인증 정보를 담는 헤더 이름 (소문자)
+_CREDENTIAL_HEADERS = frozenset({
+    "x-coupang-vendor-id",
+    "x-coupang-access-key",
+    "x-coupang-secret-key",
+    "x-cj-customer-id",
+    "x-cj-biz-reg-num",
+    "x-sender-name",
+    "x-sender-phone",
+    "x-sender-zipcode",
+    "x-sender-address",
+})
+
+
 def extract_credentials_from_headers(headers: dict) -> UserCredentials:
     """HTTP 헤더에서 사용자 인증 정보 추출"""
+    if _CREDENTIAL_HEADERS.isdisjoint(headers):
+        return _EMPTY_CREDENTIALS
+
     def get_header(name: str) -> Optional[str]:
         value = headers.get(name) or headers.get(name.lower())
         return unquote(value) if value else None
@@ -103,8 +123,13 @@ def credentials_from_db_row(row: dict) -> UserCredentials:
     )
 
 
+# 토큰 조회 함수 (database 모듈은 지연 로드하되, 요청마다 import하지 않도록 최초 1회만 바인딩)
+_get_credentials_by_token: Optional[Callable[[str], Optional[dict]]] = None
+
+
 def extract_credentials_from_token(headers: dict) -> Optional[UserCredentials]:
     """Authorization 헤더의 Bearer 토큰으로 credentials 조회"""
+    global _get_credentials_by_token
     auth_header = headers.get("authorization") or headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         return None
@@ -112,8 +137,10 @@ def extract_credentials_from_token(headers: dict) -> Optional[UserCredentials]:
     token = auth_header[7:]
 
     try:
-        from database import get_credentials_by_token
-        cred_row = get_credentials_by_token(token)
+        if _get_credentials_by_token is None:
+            from database import get_credentials_by_token
+            _get_credentials_by_token = get_credentials_by_token
+        cred_row = _get_credentials_by_token(token)
         if cred_row:
             return credentials_from_db_row(cred_row)
     except Exception:
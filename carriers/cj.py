@@ -6,13 +6,18 @@ CJ Logistics DX API 연동:
 - 운송장 발급: ReqInvcNo
 - 접수: RegBook
 """
+import asyncio
+import itertools
 import re
+import time
 import httpx
+import orjson
 import secrets
 import structlog
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple, List
 
+from http_client import API_LIMITS, get_http_client
 from models import ShippingRequest, ShippingResponse
 
 logger = structlog.get_logger()
@@ -20,7 +25,116 @@ logger = structlog.get_logger()
 BASE_URL_TEST = "https://dxapi-dev.cjlogistics.com:5054"
 BASE_URL_PROD = "https://dxapi.cjlogistics.com:5052"
 
+# 호출하는 DX API 엔드포인트 URL은 고정이므로 환경별로 미리 파싱해 둠
+_ENDPOINTS = ("ReqOneDayToken", "ReqAddrRfnSm", "ReqInvcNo", "RegBook")
+_ENDPOINT_URLS = {
+    base_url: {endpoint: httpx.URL(f"{base_url}/{endpoint}") for endpoint in _ENDPOINTS}
+    for base_url in (BASE_URL_TEST, BASE_URL_PROD)
+}
+
+# 접수 등록(RegBook) 고정 필드 - 요청마다 다시 만들지 않도록 모듈 상수로 유지
+_BOOKING_STATIC_FIELDS = {
+    "RCPT_DV": "01",
+    "WORK_DV_CD": "01",
+    "REQ_DV_CD": "01",
+    "CAL_DV_CD": "01",
+    "FRT_DV_CD": "03",
+    "CNTR_ITEM_CD": "01",
+    "BOX_TYPE_CD": "02",
+    "BOX_QTY": "1",
+    "FRT": "0",
+    "ORI_INVC_NO": "",
+    "COLCT_EXPCT_YMD": "",
+    "COLCT_EXPCT_HOUR": "",
+    "SHIP_EXPCT_YMD": "",
+    "SHIP_EXPCT_HOUR": "",
+    "PRT_ST": "02",
+    "REMARK_2": "",
+    "REMARK_3": "",
+    "COD_YN": "N",
+    "ETC_1": "",
+    "ETC_2": "1",
+    "ETC_3": "",
+    "ETC_4": "",
+    "ETC_5": "",
+    "DLV_DV": "01",
+    "RCPT_SERIAL": "",
+}
 
+# 주소 검증 결과 캐시 (같은 수령인 주소 재검증 시 API 호출 생략)
+ADDRESS_CACHE_TTL_SECONDS = 600
+ADDRESS_CACHE_MAX_SIZE = 1000
+
+# 전화번호/주소 분리용 정규식 (송장마다 호출되므로 미리 컴파일)
+_NON_DIGIT_RE = re.compile(r"[^0-9]")
+_ADDRESS_SPLIT_RE = re.compile(r"(.*?(?:시|구|군|동|읍|면|리|로|길)\s+\S+)\s+(.*)")
+
+# 토큰 발급 요청 헤더 (인증 전이라 고정)
+_TOKEN_REQUEST_HEADERS = {"Content-Type": "application/json"}
+
+# 테스트 송장 일련번호 (프로세스 내 단조 증가, 시작값만 무작위 → 같은 초 안에서도 중복 없음)
+_test_invoice_seq = itertools.count(secrets.randbelow(10000))
+
+# 서킷 브레이커 (CJ API 장애 시 타임아웃까지 기다리는 요청이 쌓이지 않도록 즉시 실패)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_WINDOW_SECONDS = 60.0
+CIRCUIT_OPEN_SECONDS = 30.0
+
+
+class _CircuitBreaker:
+    """호스트 단위 서킷 브레이커 (윈도우 내 연속 장애 시 일정 시간 차단)
+
+    차단 시간이 지나면 시험 요청 하나만 통과시키고(반개방), 나머지는 계속 즉시 실패시킵니다.
+    시험 요청이 성공하면 닫히고, 실패하면 바로 다시 차단됩니다.
+    """
+
+    __slots__ = ("failures", "window_start", "open_until", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.window_start = 0.0
+        self.open_until = 0.0
+        self.probing = False
+
+    def allow_request(self, now: float) -> bool:
+        """요청 허용 여부 (반개방 상태에서 허용되면 그 요청이 시험 요청)"""
+        if not self.open_until:
+            return True
+        if now < self.open_until or self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def release_probe(self):
+        """성공/실패 판정 없이 끝난 시험 요청 (풀 대기 초과, 취소) - 다음 요청이 다시 시험"""
+        self.probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def record_failure(self, now: float) -> bool:
+        """장애 기록. 이번 실패로 차단되면 True"""
+        if self.probing:
+            self.probing = False
+            self.open_until = now + CIRCUIT_OPEN_SECONDS
+            return True
+        if self.open_until:
+            # 이미 차단 중 (차단 전에 시작된 요청의 실패)
+            return False
+        if now - self.window_start > CIRCUIT_WINDOW_SECONDS:
+            self.window_start = now
+            self.failures = 0
+        self.failures += 1
+        if self.failures < CIRCUIT_FAILURE_THRESHOLD:
+            return False
+        self.open_until = now + CIRCUIT_OPEN_SECONDS
+        self.failures = 0
+        return True
+
+
+_circuits = {base_url: _CircuitBreaker() for base_url in (BASE_URL_TEST, BASE_URL_PROD)}
 
 
 # 주소 정제 오류 코드 → 메시지 매핑 (문서 p.11)
@@ -42,6 +156,10 @@ _ADDR_ERROR_MESSAGES = {
 class CJClient:
     """CJ대한통운 DX API 클라이언트"""
 
+    # 택배사 식별 정보 (쿠팡 송장 등록 시 택배사 코드로 사용)
+    carrier_code = "CJGLS"
+    carrier_name = "CJ대한통운"
+
     def __init__(
         self,
         customer_id: str,
@@ -52,16 +170,23 @@ class CJClient:
         self.biz_reg_num = biz_reg_num
         self.test_mode = test_mode
         self.base_url = BASE_URL_TEST if test_mode else BASE_URL_PROD
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self._endpoint_urls = _ENDPOINT_URLS[self.base_url]
+        self._circuit = _circuits[self.base_url]
 
         # Token cache
         self._token: Optional[str] = None
         self._token_expires: Optional[datetime] = None
+        self._token_lock = asyncio.Lock()
+        self._auth_headers: dict = {}
+        self._auth_headers_token: Optional[str] = None
+
+        # 주소 검증 결과 캐시 (주소 → (만료 시각, 결과))
+        self._addr_cache: dict[str, Tuple[float, dict]] = {}
 
     @staticmethod
     def _split_phone(phone: str) -> Tuple[str, str, str]:
         """전화번호를 3분할. '010-3508-4959', '0502-1234-5678', '02-1234-5678' 등 처리"""
-        digits = re.sub(r"[^0-9]", "", phone)
+        digits = _NON_DIGIT_RE.sub("", phone)
         if len(digits) < 9:
             return digits, "", ""
         # 서울 02 지역번호 (2-X-4)
@@ -77,7 +202,7 @@ class CJClient:
     def _split_address(address: str) -> Tuple[str, str]:
         """주소를 기본주소 + 상세주소로 분리"""
         # 시/구/군/동/읍/면/리 뒤의 공백에서 분리 시도
-        match = re.search(r"(.*?(?:시|구|군|동|읍|면|리|로|길)\s+\S+)\s+(.*)", address)
+        match = _ADDRESS_SPLIT_RE.search(address)
         if match:
             return match.group(1), match.group(2)
         # 패턴 매칭 실패시 절반으로 분리
@@ -87,6 +212,62 @@ class CJClient:
             return address, ""
         return address[:space_idx], address[space_idx + 1:]
 
+    def _headers_for(self, token: str) -> dict:
+        """토큰 인증 헤더 (토큰이 바뀔 때만 새로 생성)"""
+        if self._auth_headers_token != token:
+            self._auth_headers = {
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "CJ-Gateway-APIKey": token,
+            }
+            self._auth_headers_token = token
+        return self._auth_headers
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """공유 HTTP 클라이언트 (테스트 모드처럼 API를 호출하지 않으면 생성하지 않음)"""
+        return get_http_client()
+
+    async def _post(self, endpoint: str, data: dict, token: Optional[str] = None) -> dict:
+        """DX API 공통 POST ({"DATA": ...} 요청 → 응답 본문 dict)"""
+        circuit = self._circuit
+        if not circuit.allow_request(time.monotonic()):
+            raise RuntimeError("CJ DX API 응답 장애로 요청을 잠시 중단했습니다. 잠시 후 다시 시도하세요.")
+        is_probe = circuit.probing
+
+        headers = self._headers_for(token) if token else _TOKEN_REQUEST_HEADERS
+        try:
+            resp = await self.http_client.post(
+                self._endpoint_urls[endpoint],
+                content=orjson.dumps({"DATA": data}),
+                headers=headers,
+            )
+        except httpx.PoolTimeout:
+            # 로컬 커넥션 풀 포화는 CJ 장애가 아니므로 서킷에 반영하지 않음
+            logger.warning("cj.pool_exhausted", endpoint=endpoint, max_connections=API_LIMITS.max_connections)
+            if is_probe:
+                circuit.release_probe()
+            raise
+        except httpx.TransportError:
+            self._record_failure(endpoint)
+            raise
+        except BaseException:
+            # 취소 등으로 판정 없이 끝나면 시험 요청 자리를 반납
+            if is_probe:
+                circuit.release_probe()
+            raise
+        if resp.status_code >= 500:
+            self._record_failure(endpoint)
+        else:
+            circuit.record_success()
+        resp.raise_for_status()
+        return orjson.loads(resp.content)
+
+    def _record_failure(self, endpoint: str):
+        """연결 실패/5xx 응답을 서킷에 기록"""
+        if self._circuit.record_failure(time.monotonic()):
+            logger.warning("cj.circuit_open", endpoint=endpoint, open_seconds=CIRCUIT_OPEN_SECONDS)
+
     async def validate_delivery_address(self, address: str) -> dict:
         """CJ DX API 주소 정제 (ReqAddrRfnSm) - 배송 가능 여부 검증
 
@@ -110,26 +291,29 @@ class CJClient:
         if not address or len(address) > 100:
             return {"success": False, "deliverable": False, "error": "주소가 비어있거나 너무 깁니다 (최대 100자)"}
 
+        now = time.monotonic()
+        cached = self._addr_cache.get(address)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        result = await self._fetch_address_validation(address)
+        # 정상 응답만 캐시 (네트워크 오류 등 실패 결과는 다음 요청에서 재시도)
+        if result.get("success"):
+            if len(self._addr_cache) >= ADDRESS_CACHE_MAX_SIZE:
+                self._addr_cache.clear()
+            self._addr_cache[address] = (now + ADDRESS_CACHE_TTL_SECONDS, result)
+        return result
+
+    async def _fetch_address_validation(self, address: str) -> dict:
+        """ReqAddrRfnSm 호출 및 응답 해석"""
         try:
             token = await self._get_token()
-            resp = await self.http_client.post(
-                f"{self.base_url}/ReqAddrRfnSm",
-                json={
-                    "DATA": {
-                        "TOKEN_NUM": token,
-                        "CLNTNUM": self.customer_id,
-                        "CLNTMGMCUSTCD": self.customer_id,
-                        "ADDRESS": address,
-                    }
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    "CJ-Gateway-APIKey": token,
-                },
-            )
-            resp.raise_for_status()
-            body = resp.json()
+            body = await self._post("ReqAddrRfnSm", {
+                "TOKEN_NUM": token,
+                "CLNTNUM": self.customer_id,
+                "CLNTMGMCUSTCD": self.customer_id,
+                "ADDRESS": address,
+            }, token)
 
             result_cd = body.get("RESULT_CD", "")
 
@@ -179,19 +363,19 @@ class CJClient:
         if self._token and self._token_expires and now < self._token_expires:
             return self._token
 
+        # 동시 발급 요청이 몰려도 토큰은 한 번만 요청
+        async with self._token_lock:
+            if self._token and self._token_expires and now < self._token_expires:
+                return self._token
+            return await self._request_token(now)
+
+    async def _request_token(self, now: datetime) -> str:
+        """토큰 신규 발급 (ReqOneDayToken)"""
         logger.info("cj.requesting_token", customer_id=self.customer_id)
-        resp = await self.http_client.post(
-            f"{self.base_url}/ReqOneDayToken",
-            json={
-                "DATA": {
-                    "CUST_ID": self.customer_id,
-                    "BIZ_REG_NUM": self.biz_reg_num,
-                }
-            },
-            headers={"Content-Type": "application/json"},
-        )
-        resp.raise_for_status()
-        body = resp.json()
+        body = await self._post("ReqOneDayToken", {
+            "CUST_ID": self.customer_id,
+            "BIZ_REG_NUM": self.biz_reg_num,
+        })
 
         if body.get("RESULT_CD") != "S":
             detail = body.get("RESULT_DETAIL", body.get("RESULT_MSG", "알 수 없는 오류"))
@@ -220,22 +404,10 @@ class CJClient:
     async def _request_invoice_number(self, token: str) -> str:
         """운송장 번호 발급"""
         logger.info("cj.requesting_invoice_number")
-        resp = await self.http_client.post(
-            f"{self.base_url}/ReqInvcNo",
-            json={
-                "DATA": {
-                    "CLNTNUM": self.customer_id,
-                    "TOKEN_NUM": token,
-                }
-            },
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "CJ-Gateway-APIKey": token,
-            },
-        )
-        resp.raise_for_status()
-        body = resp.json()
+        body = await self._post("ReqInvcNo", {
+            "CLNTNUM": self.customer_id,
+            "TOKEN_NUM": token,
+        }, token)
 
         if body.get("RESULT_CD") != "S":
             detail = body.get("RESULT_DETAIL", body.get("RESULT_MSG", "알 수 없는 오류"))
@@ -250,9 +422,8 @@ class CJClient:
 
     def _build_array_items(self, requests: List[ShippingRequest]) -> list:
         """합포장 ARRAY 아이템 목록 생성"""
-        items = []
-        for seq, req in enumerate(requests, start=1):
-            items.append({
+        return [
+            {
                 "MPCK_SEQ": str(seq),
                 "GDS_CD": "01",
                 "GDS_NM": req.product_name,
@@ -260,19 +431,20 @@ class CJClient:
                 "UNIT_CD": "01",
                 "UNIT_NM": "EA",
                 "GDS_AMT": "0",
-            })
-        return items
+            }
+            for seq, req in enumerate(requests, start=1)
+        ]
 
     async def _register_booking(
         self, token: str, invoice_no: str, request: ShippingRequest,
         *, mpck_key: str = "", array_items: Optional[list] = None
     ) -> None:
         """접수 등록 (RegBook). array_items가 주어지면 합포장 처리."""
-        now = datetime.now()
-        today = now.strftime("%Y%m%d")
-        order_id = request.order_id or f"ORD{now.strftime('%Y%m%d%H%M%S')}"
+        stamp = time.strftime("%Y%m%d%H%M%S")
+        today = stamp[:8]
+        order_id = request.order_id or f"ORD{stamp}"
         # CUST_USE_NO에 타임스탬프 suffix 추가 → 재시도 시 ORA-00001 중복 방지
-        cust_use_no = f"{order_id}_{now.strftime('%H%M%S')}"
+        cust_use_no = f"{order_id}_{stamp[8:]}"
         if not mpck_key:
             mpck_key = f"{today}_{self.customer_id}_{order_id}"
 
@@ -295,98 +467,62 @@ class CJClient:
             array_items = self._build_array_items([request])
 
         payload = {
-            "DATA": {
-                "CUST_ID": self.customer_id,
-                "TOKEN_NUM": token,
-                "RCPT_YMD": today,
-                "CUST_USE_NO": cust_use_no,
-                "RCPT_DV": "01",
-                "WORK_DV_CD": "01",
-                "REQ_DV_CD": "01",
-                "MPCK_KEY": mpck_key,
-                "CAL_DV_CD": "01",
-                "FRT_DV_CD": "03",
-                "CNTR_ITEM_CD": "01",
-                "BOX_TYPE_CD": "02",
-                "BOX_QTY": "1",
-                "FRT": "0",
-                "CUST_MGMT_DLCM_CD": self.customer_id,
-                "SENDR_NM": request.sender_name,
-                "SENDR_TEL_NO1": s1,
-                "SENDR_TEL_NO2": s2,
-                "SENDR_TEL_NO3": s3,
-                "SENDR_CELL_NO1": s1,
-                "SENDR_CELL_NO2": s2,
-                "SENDR_CELL_NO3": s3,
-                "SENDR_SAFE_NO1": s1,
-                "SENDR_SAFE_NO2": s2,
-                "SENDR_SAFE_NO3": s3,
-                "SENDR_ZIP_NO": request.sender_zipcode,
-                "SENDR_ADDR": s_addr,
-                "SENDR_DETAIL_ADDR": s_detail,
-                "RCVR_NM": request.receiver_name,
-                "RCVR_TEL_NO1": r1,
-                "RCVR_TEL_NO2": r2,
-                "RCVR_TEL_NO3": r3,
-                "RCVR_CELL_NO1": r1,
-                "RCVR_CELL_NO2": r2,
-                "RCVR_CELL_NO3": r3,
-                "RCVR_SAFE_NO1": r1,
-                "RCVR_SAFE_NO2": r2,
-                "RCVR_SAFE_NO3": r3,
-                "RCVR_ZIP_NO": request.receiver_zipcode,
-                "RCVR_ADDR": r_addr,
-                "RCVR_DETAIL_ADDR": r_detail,
-                "ORDRR_NM": request.sender_name,
-                "ORDRR_TEL_NO1": s1,
-                "ORDRR_TEL_NO2": s2,
-                "ORDRR_TEL_NO3": s3,
-                "ORDRR_CELL_NO1": s1,
-                "ORDRR_CELL_NO2": s2,
-                "ORDRR_CELL_NO3": s3,
-                "ORDRR_SAFE_NO1": s1,
-                "ORDRR_SAFE_NO2": s2,
-                "ORDRR_SAFE_NO3": s3,
-                "ORDRR_ZIP_NO": request.sender_zipcode,
-                "ORDRR_ADDR": s_addr,
-                "ORDRR_DETAIL_ADDR": s_detail,
-                "INVC_NO": invoice_no,
-                "ORI_INVC_NO": "",
-                "ORI_ORD_NO": order_id,
-                "COLCT_EXPCT_YMD": "",
-                "COLCT_EXPCT_HOUR": "",
-                "SHIP_EXPCT_YMD": "",
-                "SHIP_EXPCT_HOUR": "",
-                "PRT_ST": "02",
-                "ARTICLE_AMT": str(len(array_items)),
-                "REMARK_1": request.memo or "",
-                "REMARK_2": "",
-                "REMARK_3": "",
-                "COD_YN": "N",
-                "ETC_1": "",
-                "ETC_2": "1",
-                "ETC_3": "",
-                "ETC_4": "",
-                "ETC_5": "",
-                "DLV_DV": "01",
-                "RCPT_SERIAL": "",
-                "ARRAY": array_items,
-            }
+            **_BOOKING_STATIC_FIELDS,
+            "CUST_ID": self.customer_id,
+            "TOKEN_NUM": token,
+            "RCPT_YMD": today,
+            "CUST_USE_NO": cust_use_no,
+            "MPCK_KEY": mpck_key,
+            "CUST_MGMT_DLCM_CD": self.customer_id,
+            "SENDR_NM": request.sender_name,
+            "SENDR_TEL_NO1": s1,
+            "SENDR_TEL_NO2": s2,
+            "SENDR_TEL_NO3": s3,
+            "SENDR_CELL_NO1": s1,
+            "SENDR_CELL_NO2": s2,
+            "SENDR_CELL_NO3": s3,
+            "SENDR_SAFE_NO1": s1,
+            "SENDR_SAFE_NO2": s2,
+            "SENDR_SAFE_NO3": s3,
+            "SENDR_ZIP_NO": request.sender_zipcode,
+            "SENDR_ADDR": s_addr,
+            "SENDR_DETAIL_ADDR": s_detail,
+            "RCVR_NM": request.receiver_name,
+            "RCVR_TEL_NO1": r1,
+            "RCVR_TEL_NO2": r2,
+            "RCVR_TEL_NO3": r3,
+            "RCVR_CELL_NO1": r1,
+            "RCVR_CELL_NO2": r2,
+            "RCVR_CELL_NO3": r3,
+            "RCVR_SAFE_NO1": r1,
+            "RCVR_SAFE_NO2": r2,
+            "RCVR_SAFE_NO3": r3,
+            "RCVR_ZIP_NO": request.receiver_zipcode,
+            "RCVR_ADDR": r_addr,
+            "RCVR_DETAIL_ADDR": r_detail,
+            "ORDRR_NM": request.sender_name,
+            "ORDRR_TEL_NO1": s1,
+            "ORDRR_TEL_NO2": s2,
+            "ORDRR_TEL_NO3": s3,
+            "ORDRR_CELL_NO1": s1,
+            "ORDRR_CELL_NO2": s2,
+            "ORDRR_CELL_NO3": s3,
+            "ORDRR_SAFE_NO1": s1,
+            "ORDRR_SAFE_NO2": s2,
+            "ORDRR_SAFE_NO3": s3,
+            "ORDRR_ZIP_NO": request.sender_zipcode,
+            "ORDRR_ADDR": s_addr,
+            "ORDRR_DETAIL_ADDR": s_detail,
+            "INVC_NO": invoice_no,
+            "ORI_ORD_NO": order_id,
+            "ARTICLE_AMT": str(len(array_items)),
+            "REMARK_1": request.memo or "",
+            "ARRAY": array_items,
         }
 
         item_count = len(array_items)
         logger.info("cj.registering_booking", invoice_no=invoice_no, order_id=order_id, item_count=item_count)
-        resp = await self.http_client.post(
-            f"{self.base_url}/RegBook",
-            json=payload,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "CJ-Gateway-APIKey": token,
-            },
-        )
-        resp.raise_for_status()
-        body = resp.json()
+        body = await self._post("RegBook", payload, token)
 
         if body.get("RESULT_CD") != "S":
             raise RuntimeError(f"접수 등록 실패: {body.get('RESULT_DETAIL', body.get('RESULT_MSG', body))}")
@@ -420,24 +556,8 @@ class CJClient:
             if validation.get("warning"):
                 response.error = validation["warning"]
             return response
-        except (httpx.ConnectError, httpx.TimeoutException):
-            return ShippingResponse(
-                success=False,
-                error="CJ DX API 서버에 연결할 수 없습니다. 네트워크를 확인하세요.",
-            )
-        except httpx.HTTPStatusError as e:
-            return ShippingResponse(
-                success=False,
-                error=f"CJ API 서버 오류 (HTTP {e.response.status_code})",
-            )
-        except RuntimeError as e:
-            return ShippingResponse(success=False, error=str(e))
         except Exception as e:
-            logger.exception("cj.unexpected_error")
-            return ShippingResponse(
-                success=False,
-                error=f"CJ 송장 발급 중 오류 발생: {str(e)}",
-            )
+            return self._error_response(e, "CJ 송장 발급 중 오류 발생", "cj.unexpected_error")
 
     async def request_consolidated_invoice(
         self, requests: List[ShippingRequest]
@@ -494,19 +614,26 @@ class CJClient:
             if validation.get("warning"):
                 response.error = validation["warning"]
             return response
-        except (httpx.ConnectError, httpx.TimeoutException):
-            return ShippingResponse(success=False, error="CJ DX API 서버에 연결할 수 없습니다.")
-        except httpx.HTTPStatusError as e:
-            return ShippingResponse(success=False, error=f"CJ API 서버 오류 (HTTP {e.response.status_code})")
-        except RuntimeError as e:
-            return ShippingResponse(success=False, error=str(e))
         except Exception as e:
-            logger.exception("cj.consolidated_unexpected_error")
-            return ShippingResponse(success=False, error=f"합포장 송장 발급 중 오류: {str(e)}")
+            return self._error_response(e, "합포장 송장 발급 중 오류", "cj.consolidated_unexpected_error")
+
+    @staticmethod
+    def _error_response(e: Exception, message: str, log_event: str) -> ShippingResponse:
+        """송장 발급 예외를 실패 응답으로 변환 (except 블록 안에서 호출)"""
+        if isinstance(e, (httpx.ConnectError, httpx.TimeoutException)):
+            error = "CJ DX API 서버에 연결할 수 없습니다. 네트워크를 확인하세요."
+        elif isinstance(e, httpx.HTTPStatusError):
+            error = f"CJ API 서버 오류 (HTTP {e.response.status_code})"
+        elif isinstance(e, RuntimeError):
+            error = str(e)
+        else:
+            logger.exception(log_event)
+            error = f"{message}: {e}"
+        return ShippingResponse(success=False, error=error)
 
     def _test_invoice(self, request: ShippingRequest) -> ShippingResponse:
         """테스트 송장 발급"""
-        tracking_number = f"TEST-{datetime.now().strftime('%Y%m%d%H%M%S')}-{secrets.randbelow(10000):04d}"
+        tracking_number = f"TEST-{time.strftime('%Y%m%d%H%M%S')}-{next(_test_invoice_seq) % 10000:04d}"
         return ShippingResponse(
             success=True,
             tracking_number=tracking_number,
@@ -514,5 +641,4 @@ class CJClient:
         )
 
     async def close(self):
-        """리소스 정리"""
-        await self.http_client.aclose()
+        """리소스 정리 (공유 클라이언트는 앱 종료 시 http_client.close_http_client로 정리)"""
@@ -4,7 +4,7 @@ from typing import Optional, List
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class ChannelOrderItem:
     """채널 주문 상품"""
     product_id: str
@@ -15,7 +15,7 @@ class ChannelOrderItem:
     total_price: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ChannelOrder:
     """채널 주문 데이터"""
     channel: str
@@ -39,7 +39,7 @@ class ChannelOrder:
             self.items = []
 
     def to_dict(self) -> dict:
-        """딕셔너리로 변환"""
+        """딕셔너리로 변환 (ordered_at은 datetime 그대로 두고 orjson 직렬화 시 ISO 8601로 변환)"""
         return {
             "channel": self.channel,
             "order_id": self.order_id,
@@ -52,7 +52,7 @@ class ChannelOrder:
             "total_amount": self.total_amount,
             "shipping_fee": self.shipping_fee,
             "buyer_memo": self.buyer_memo,
-            "ordered_at": self.ordered_at.isoformat() if self.ordered_at else None,
+            "ordered_at": self.ordered_at,
             "items": [
                 {
                     "product_id": item.product_id,
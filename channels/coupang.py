@@ -1,7 +1,9 @@
 """쿠팡 WING API 클라이언트"""
 import asyncio
+import functools
 import httpx
 import hmac
+import orjson
 import hashlib
 import time
 import structlog
@@ -9,10 +11,16 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 
+from http_client import API_LIMITS, get_http_client
 from . import ChannelOrder, ChannelOrderItem
 
 logger = structlog.get_logger()
 
+@functools.lru_cache(maxsize=1)
+def _signed_date(epoch_second: int) -> str:
+    """서명용 UTC 시각 문자열 (같은 초 안에서는 캐시된 값 재사용)"""
+    return time.strftime("%y%m%dT%H%M%SZ", time.gmtime(epoch_second))
+
 
 class CoupangClient:
     """쿠팡 WING API 클라이언트"""
@@ -23,28 +31,31 @@ class CoupangClient:
         self.vendor_id = vendor_id
         self.access_key = access_key
         self.secret_key = secret_key
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        # 서명 키는 인스턴스 생성 시 한 번만 인코딩하고, 키가 적용된 HMAC 상태를 복제해 사용
+        self._hmac_template = hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+        # Authorization 헤더의 고정 부분(알고리즘, access-key)도 한 번만 조립
+        self._authorization_prefix = f"CEA algorithm=HmacSHA256, access-key={access_key}, signed-date="
+        # 요청마다 바뀌지 않는 헤더는 템플릿으로 두고 복사 후 Authorization만 채움
+        self._header_template = {
+            "Content-Type": "application/json;charset=UTF-8",
+            "X-Requested-By": vendor_id,
+        }
+        # 벤더별 고정 경로는 인스턴스 생성 시 한 번만 조립
+        self._ordersheets_path = f"/v2/providers/openapi/apis/api/v4/vendors/{vendor_id}/ordersheets"
+        self._ordersheets_url = f"{self.BASE_URL}{self._ordersheets_path}"
+        self.http_client = get_http_client()
 
     def _generate_signature(self, method: str, path: str, query_string: str = "") -> dict:
         """HMAC-SHA256 서명 생성"""
-        datetime_str = time.strftime("%y%m%dT%H%M%SZ", time.gmtime())
+        datetime_str = _signed_date(int(time.time()))
 
-        message = datetime_str + method + path + query_string
+        mac = self._hmac_template.copy()
+        mac.update(f"{datetime_str}{method}{path}{query_string}".encode("utf-8"))
+        signature = mac.hexdigest()
 
-        signature = hmac.new(
-            self.secret_key.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-
-        authorization = f"CEA algorithm=HmacSHA256, access-key={self.access_key}, " \
-                       f"signed-date={datetime_str}, signature={signature}"
-
-        return {
-            "Authorization": authorization,
-            "Content-Type": "application/json;charset=UTF-8",
-            "X-Requested-By": self.vendor_id
-        }
+        headers = self._header_template.copy()
+        headers["Authorization"] = f"{self._authorization_prefix}{datetime_str}, signature={signature}"
+        return headers
 
     async def get_new_orders(self, days: int = 7) -> List[dict]:
         """신규 주문 조회 (발주대기 + 발주확인 상태, 병렬 호출)"""
@@ -52,26 +63,23 @@ class CoupangClient:
             self._fetch_orders_by_status("INSTRUCT", days),
             self._fetch_orders_by_status("ACCEPT", days),
         )
-        all_orders = []
-        for orders in results:
-            all_orders.extend(orders)
+        all_orders = [order for orders in results for order in orders]
         logger.info("쿠팡 주문 조회 완료", count=len(all_orders))
         return all_orders
 
     async def _fetch_orders_by_status(self, status: str, days: int) -> List[dict]:
         """단일 상태의 주문 조회"""
         try:
-            path = f"/v2/providers/openapi/apis/api/v4/vendors/{self.vendor_id}/ordersheets"
             params = {
                 "createdAtFrom": (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d"),
                 "createdAtTo": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
                 "status": status
             }
             query_string = urlencode(params)
-            headers = self._generate_signature("GET", path, query_string)
+            headers = self._generate_signature("GET", self._ordersheets_path, query_string)
 
             response = await self.http_client.get(
-                f"{self.BASE_URL}{path}",
+                self._ordersheets_url,
                 params=params,
                 headers=headers
             )
@@ -80,15 +88,17 @@ class CoupangClient:
                 logger.error("주문 조회 실패", status_code=response.status_code, order_status=status)
                 return []
 
-            data = response.json()
+            data = orjson.loads(response.content)
             logger.debug("쿠팡 API 응답", order_status=status, data_count=len(data.get("data", [])))
-            orders = []
-            for order_data in data.get("data", []):
-                order = self._parse_order(order_data)
-                if order:
-                    orders.append(order.to_dict())
-            return orders
-
+            return [
+                order.to_dict()
+                for order_data in data.get("data", [])
+                if (order := self._parse_order(order_data))
+            ]
+
+        except httpx.PoolTimeout:
+            logger.warning("쿠팡 커넥션 풀 포화", order_status=status, max_connections=API_LIMITS.max_connections)
+            return []
         except Exception as e:
             logger.exception("주문 조회 오류", error=str(e), order_status=status)
             return []
@@ -98,19 +108,20 @@ class CoupangClient:
         try:
             items = []
             for product in data.get("orderItems", []):
+                quantity = product.get("shippingCount", 1)
+                price = product.get("orderPrice", 0)
                 item = ChannelOrderItem(
                     product_id=str(product.get("vendorItemId", "")),
                     product_name=product.get("vendorItemName", ""),
                     option_name=product.get("sellerProductItemName"),
-                    quantity=product.get("shippingCount", 1),
-                    unit_price=product.get("orderPrice", 0),
-                    total_price=product.get("orderPrice", 0) * product.get("shippingCount", 1)
+                    quantity=quantity,
+                    unit_price=price,
+                    total_price=price * quantity
                 )
                 items.append(item)
 
             receiver = data.get("receiver", {})
             orderer = data.get("orderer", {})
-            logger.debug("쿠팡 receiver 데이터", receiver_keys=list(receiver.keys()), receiver=receiver)
 
             # 쿠팡 API receiver 전화번호: safeNumber(안심번호, 0502-xxxx-xxxx)가 기본
             receiver_phone = (
@@ -120,10 +131,15 @@ class CoupangClient:
                 or ""
             )
 
-            ordered_at_str = data.get("orderedAt", "")
-            try:
-                ordered_at = datetime.fromisoformat(ordered_at_str.replace("Z", "+00:00"))
-            except Exception:
+            # Python 3.11+ fromisoformat은 "Z" 접미사를 직접 처리
+            ordered_at_str = data.get("orderedAt")
+            ordered_at = None
+            if ordered_at_str:
+                try:
+                    ordered_at = datetime.fromisoformat(ordered_at_str)
+                except (TypeError, ValueError):
+                    pass
+            if ordered_at is None:
                 ordered_at = datetime.now()
 
             return ChannelOrder(
@@ -155,18 +171,18 @@ class CoupangClient:
     ) -> bool:
         """송장 등록"""
         try:
-            path = f"/v2/providers/openapi/apis/api/v4/vendors/{self.vendor_id}/ordersheets/{order_id}/invoices"
+            path = f"{self._ordersheets_path}/{order_id}/invoices"
             headers = self._generate_signature("POST", path)
 
             response = await self.http_client.post(
                 f"{self.BASE_URL}{path}",
                 headers=headers,
-                json={
+                content=orjson.dumps({
                     "vendorId": self.vendor_id,
                     "shipmentBoxId": int(order_id),
                     "deliveryCompanyCode": carrier_code,
                     "invoiceNumber": tracking_number
-                }
+                })
             )
 
             if response.status_code in [200, 201]:
@@ -176,10 +192,12 @@ class CoupangClient:
                 logger.error("송장 등록 실패", order_id=order_id, status=response.status_code, body=response.text[:500])
                 return False
 
+        except httpx.PoolTimeout:
+            logger.warning("쿠팡 커넥션 풀 포화", order_id=order_id, max_connections=API_LIMITS.max_connections)
+            return False
         except Exception as e:
             logger.exception("송장 등록 오류", error=str(e))
             return False
 
     async def close(self):
-        """리소스 정리"""
-        await self.http_client.aclose()
+        """리소스 정리 (공유 클라이언트는 앱 종료 시 http_client.close_http_client로 정리)"""
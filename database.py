@@ -1,34 +1,76 @@
 """데이터베이스 모듈 - SQLite 기반 사용자/토큰 관리"""
+import asyncio
 import sqlite3
 import hashlib
+import hmac
 import secrets
 import os
+import threading
+import time
 import bcrypt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 DATABASE_PATH = os.environ.get("DATABASE_PATH", "data/users.db")
 
+# bcrypt 비용 (2^rounds 반복). 기존 해시는 로그인 시 이 값으로 재해싱됨
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "10"))
+
+# 준비된 문장(prepared statement) 캐시 크기 - 연결을 재사용해야 캐시가 유지됨
+STATEMENT_CACHE_SIZE = 256
+
+# 잠금 대기 시간 (ms) - 스케줄러/웹 요청 동시 쓰기 시 즉시 "database is locked" 실패 방지
+BUSY_TIMEOUT_MS = 5000
+
+# 스레드별 연결 재사용 (sqlite3 연결은 생성한 스레드에서만 사용 가능)
+_local = threading.local()
+
+
+_db_dir_ready = False
+
 
 def get_db_path() -> str:
-    """데이터베이스 경로 반환 및 디렉토리 생성"""
-    db_dir = os.path.dirname(DATABASE_PATH)
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir)
+    """데이터베이스 경로 반환 및 디렉토리 생성 (디렉토리 확인은 프로세스당 한 번)"""
+    global _db_dir_ready
+    if not _db_dir_ready:
+        db_dir = os.path.dirname(DATABASE_PATH)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        _db_dir_ready = True
     return DATABASE_PATH
 
 
+def _dict_row_factory(cursor: sqlite3.Cursor, row: tuple) -> dict:
+    """조회 결과를 바로 dict로 생성 (sqlite3.Row → dict 변환 단계 생략)"""
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+def _get_thread_connection() -> sqlite3.Connection:
+    """현재 스레드의 연결 반환 (없으면 생성)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(get_db_path(), cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = _dict_row_factory
+        # WAL: 읽기와 쓰기가 서로 막지 않음, NORMAL: WAL에서는 커밋마다 fsync 불필요
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        _local.conn = conn
+    return conn
+
+
 @contextmanager
 def get_connection():
-    """데이터베이스 연결 컨텍스트 매니저"""
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
+    """데이터베이스 연결 컨텍스트 매니저 (스레드별 연결 재사용, 블록 단위 트랜잭션)"""
+    conn = _get_thread_connection()
     try:
         yield conn
         conn.commit()
-    finally:
-        conn.close()
+    except BaseException:
+        conn.rollback()
+        raise
 
 
 def init_database():
@@ -60,6 +102,10 @@ def init_database():
                 attempts INTEGER DEFAULT 0
             )
         """)
+        # 미사용 인증 코드 조회 (email + type)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_verification_codes_lookup ON verification_codes(email, type, used)"
+        )
 
         # API 키 설정 테이블 (MVP: 쿠팡 + CJ대한통운)
         cursor.execute("""
@@ -98,6 +144,10 @@ def init_database():
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         """)
+        # 크론 틱마다 활성화된 자동화만 조회 (부분 인덱스)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_automation_settings_enabled ON automation_settings(user_id) WHERE enabled = 1"
+        )
 
         # 처리 로그 테이블
         cursor.execute("""
@@ -113,6 +163,8 @@ def init_database():
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         """)
+        # 사용자별 로그 조회 (인덱스에 rowid가 포함되어 id 내림차순 정렬도 인덱스로 처리)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_processing_logs_user ON processing_logs(user_id)")
 
         # 토큰 테이블
         cursor.execute("""
@@ -128,18 +180,55 @@ def init_database():
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         """)
+        # 토큰 관리 페이지의 사용자별 목록 조회
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tokens_user ON tokens(user_id)")
+
+
+# bcrypt 전용 스레드 풀 (해싱 중 이벤트 루프가 멈추지 않도록, 동시 해싱 수는 제한)
+_BCRYPT_EXECUTOR = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="bcrypt")
+
+
+async def run_in_bcrypt_pool(func, *args):
+    """bcrypt 연산이 포함된 함수를 전용 스레드 풀에서 실행"""
+    return await asyncio.get_running_loop().run_in_executor(_BCRYPT_EXECUTOR, func, *args)
 
 
 def hash_password(password: str) -> str:
     """비밀번호 해싱 (bcrypt)"""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """레거시 SHA256 해시이거나 bcrypt 비용이 BCRYPT_ROUNDS와 다르면 재해싱 필요"""
+    # bcrypt 해시 형식: $2b$<rounds>$<salt+hash>
+    return not hashed.startswith('$2') or hashed[4:6] != f"{BCRYPT_ROUNDS:02d}"
+
+
+# bcrypt 검증 성공 캐시 (같은 비밀번호 재검증 시 bcrypt 연산 생략)
+# 키는 프로세스별 비밀키로 HMAC한 값이라 평문 비밀번호는 메모리에 남지 않고, 실패 결과는 캐시하지 않음
+_VERIFY_CACHE_SECRET = secrets.token_bytes(32)
+VERIFY_CACHE_MAX_SIZE = 4096
+_verified_passwords: set[bytes] = set()
+
+
+def _verify_cache_key(password: str, hashed: str) -> bytes:
+    return hmac.new(_VERIFY_CACHE_SECRET, f"{hashed}\0{password}".encode(), hashlib.sha256).digest()
 
 
 def verify_password(password: str, hashed: str) -> bool:
     """비밀번호 검증"""
     # bcrypt 해시인지 확인 (bcrypt 해시는 $2로 시작)
     if hashed.startswith('$2'):
-        return bcrypt.checkpw(password.encode(), hashed.encode())
+        # 해시가 키에 포함되므로 비밀번호가 바뀌면 이전 캐시는 자연히 무효
+        cache_key = _verify_cache_key(password, hashed)
+        if cache_key in _verified_passwords:
+            return True
+        if not bcrypt.checkpw(password.encode(), hashed.encode()):
+            return False
+        if len(_verified_passwords) >= VERIFY_CACHE_MAX_SIZE:
+            _verified_passwords.clear()
+        _verified_passwords.add(cache_key)
+        return True
     # 레거시 SHA256 해시 지원 (마이그레이션용)
     return hashlib.sha256(password.encode()).hexdigest() == hashed
 
@@ -153,23 +242,7 @@ def generate_token() -> str:
 
 def create_user(email: str, password: str) -> Optional[int]:
     """사용자 생성"""
-    try:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO users (email, password_hash) VALUES (?, ?)",
-                (email, hash_password(password))
-            )
-            user_id = cursor.lastrowid
-
-            # 빈 credentials 레코드 생성
-            cursor.execute(
-                "INSERT INTO user_credentials (user_id) VALUES (?)",
-                (user_id,)
-            )
-            return user_id
-    except sqlite3.IntegrityError:
-        return None
+    return create_user_with_hash(email, hash_password(password))
 
 
 def create_user_with_hash(email: str, password_hash: str) -> Optional[int]:
@@ -182,6 +255,8 @@ def create_user_with_hash(email: str, password_hash: str) -> Optional[int]:
                 (email, password_hash)
             )
             user_id = cursor.lastrowid
+
+            # 빈 credentials 레코드도 같은 트랜잭션에서 생성 (커밋 1회)
             cursor.execute(
                 "INSERT INTO user_credentials (user_id) VALUES (?)",
                 (user_id,)
@@ -193,21 +268,27 @@ def create_user_with_hash(email: str, password_hash: str) -> Optional[int]:
 
 def authenticate_user(email: str, password: str) -> Optional[int]:
     """사용자 인증 - 성공시 user_id 반환"""
+    user = authenticate_login(email, password)
+    return user["id"] if user else None
+
+
+def authenticate_login(email: str, password: str) -> Optional[dict]:
+    """로그인 인증 - 성공시 {"id", "email_verified"} 반환 (인증 여부까지 한 번의 조회로 확인)"""
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT id, password_hash FROM users WHERE email = ?",
+            "SELECT id, password_hash, email_verified FROM users WHERE email = ?",
             (email,)
         )
         row = cursor.fetchone()
         if row and verify_password(password, row["password_hash"]):
-            # 레거시 SHA256 해시를 bcrypt로 업그레이드
-            if not row["password_hash"].startswith('$2'):
+            # 레거시 SHA256 해시 또는 비용이 다른 bcrypt 해시를 현재 설정으로 재해싱
+            if password_needs_rehash(row["password_hash"]):
                 cursor.execute(
                     "UPDATE users SET password_hash = ? WHERE id = ?",
                     (hash_password(password), row["id"])
                 )
-            return row["id"]
+            return {"id": row["id"], "email_verified": bool(row["email_verified"])}
         return None
 
 
@@ -217,30 +298,70 @@ def get_user_by_id(user_id: int) -> Optional[dict]:
         cursor = conn.cursor()
         cursor.execute("SELECT id, email, created_at FROM users WHERE id = ?", (user_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return row
 
 
 # ============ API 키 관리 ============
 
+# 사용자별 API 키 캐시 (MCP 토큰 요청마다 재조회하지 않도록, 저장 시 즉시 무효화)
+CREDENTIALS_CACHE_TTL_SECONDS = 60
+_credentials_cache: dict[int, tuple[float, dict]] = {}
+
+
 def get_user_credentials(user_id: int) -> Optional[dict]:
     """사용자 API 키 조회"""
+    now = time.monotonic()
+    cached = _credentials_cache.get(user_id)
+    if cached and cached[0] > now:
+        return dict(cached[1])
+
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM user_credentials WHERE user_id = ?", (user_id,))
+        cursor.execute("""
+            SELECT user_id, coupang_vendor_id, coupang_access_key, coupang_secret_key,
+                   cj_customer_id, cj_biz_reg_num,
+                   sender_name, sender_phone, sender_zipcode, sender_address, updated_at
+            FROM user_credentials WHERE user_id = ?
+        """, (user_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+    if not row:
+        return None
+    creds = row
+    _credentials_cache[user_id] = (now + CREDENTIALS_CACHE_TTL_SECONDS, creds)
+    return dict(creds)
+
+
+def get_dashboard_data(user_id: int) -> Optional[dict]:
+    """대시보드 렌더링용 조회 (이메일 + API 키 + 자동화 설정을 한 번의 JOIN으로)"""
+    with get_connection() as conn:
+        row = conn.execute("""
+            SELECT u.email,
+                   c.coupang_vendor_id, c.coupang_access_key, c.coupang_secret_key,
+                   c.cj_customer_id, c.cj_biz_reg_num,
+                   c.sender_name, c.sender_phone, c.sender_address,
+                   COALESCE(a.enabled, 0) AS enabled,
+                   COALESCE(a.interval_minutes, 60) AS interval_minutes,
+                   a.last_run_at, a.last_result
+            FROM users u
+            LEFT JOIN user_credentials c ON c.user_id = u.id
+            LEFT JOIN automation_settings a ON a.user_id = u.id
+            WHERE u.id = ?
+        """, (user_id,)).fetchone()
+        return row
+
+
+# 사용자가 수정할 수 있는 API 키 컬럼 (SQL에 이름이 직접 들어가므로 화이트리스트로 제한)
+CREDENTIAL_FIELDS = frozenset({
+    'coupang_vendor_id', 'coupang_access_key', 'coupang_secret_key',
+    'cj_customer_id', 'cj_biz_reg_num',
+    'sender_name', 'sender_phone', 'sender_zipcode', 'sender_address'
+})
 
 
 def update_user_credentials(user_id: int, credentials: dict) -> bool:
     """사용자 API 키 업데이트"""
-    allowed_fields = [
-        'coupang_vendor_id', 'coupang_access_key', 'coupang_secret_key',
-        'cj_customer_id', 'cj_biz_reg_num',
-        'sender_name', 'sender_phone', 'sender_zipcode', 'sender_address'
-    ]
-
     # 허용된 필드만 필터링
-    filtered = {k: v for k, v in credentials.items() if k in allowed_fields}
+    filtered = {k: v for k, v in credentials.items() if k in CREDENTIAL_FIELDS}
     if not filtered:
         return False
 
@@ -254,7 +375,9 @@ def update_user_credentials(user_id: int, credentials: dict) -> bool:
             f"UPDATE user_credentials SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?",
             values
         )
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+    _credentials_cache.pop(user_id, None)
+    return updated
 
 
 # ============ 토큰 관리 ============
@@ -273,26 +396,72 @@ def create_token(user_id: int, name: str = "default", expires_days: int = 365) -
     return token
 
 
+# 토큰 검증 결과 캐시 (MCP 요청마다 UPDATE를 실행하지 않도록, 폐기/삭제 시 즉시 제거, 토큰 만료 시각 이후로는 유지하지 않음)
+# 키는 토큰의 BLAKE2s 다이제스트 (원문 토큰을 메모리 캐시에 두지 않음)
+TOKEN_CACHE_TTL_SECONDS = 60
+TOKEN_CACHE_MAX_SIZE = 10000
+_token_cache: dict[bytes, tuple[float, int, int]] = {}
+
+
+# 마지막 사용 시간 갱신 대기 중인 토큰 id (요청마다 쓰지 않고 flush_token_usage에서 일괄 UPDATE)
+_pending_token_usage: set[int] = set()
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2s(token.encode(), digest_size=16).digest()
+
+
 def validate_token(token: str) -> Optional[int]:
     """토큰 검증 - 유효하면 user_id 반환"""
+    cache_key = _token_cache_key(token)
+    now = time.monotonic()
+    cached = _token_cache.get(cache_key)
+    if cached and cached[0] > now:
+        _pending_token_usage.add(cached[2])
+        return cached[1]
+
     with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """SELECT user_id FROM tokens
+        row = conn.execute(
+            """SELECT id, user_id,
+                      (julianday(expires_at) - julianday('now')) * 86400 AS expires_in
+               FROM tokens
                WHERE token = ? AND is_active = 1
                AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)""",
             (token,)
+        ).fetchone()
+    if not row:
+        _token_cache.pop(cache_key, None)
+        return None
+    if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+        _token_cache.clear()
+    # 캐시 유효 시간은 토큰 만료 시각을 넘지 않도록 제한
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if row["expires_in"] is not None:
+        ttl = min(ttl, row["expires_in"])
+    _token_cache[cache_key] = (now + ttl, row["user_id"], row["id"])
+    _pending_token_usage.add(row["id"])
+    return row["user_id"]
+
+
+def flush_token_usage() -> int:
+    """대기 중인 토큰 last_used_at을 한 번의 UPDATE로 반영, 반영한 토큰 수 반환"""
+    if not _pending_token_usage:
+        return 0
+    token_ids = list(_pending_token_usage)
+    _pending_token_usage.difference_update(token_ids)
+    placeholders = ",".join("?" * len(token_ids))
+    with get_connection() as conn:
+        conn.execute(
+            f"UPDATE tokens SET last_used_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})",
+            token_ids
         )
-        row = cursor.fetchone()
+    return len(token_ids)
 
-        if row:
-            # 마지막 사용 시간 업데이트
-            cursor.execute(
-                "UPDATE tokens SET last_used_at = CURRENT_TIMESTAMP WHERE token = ?",
-                (token,)
-            )
-            return row["user_id"]
-        return None
+
+def _purge_token_cache(token_id: int):
+    """폐기/삭제된 토큰을 캐시에서 제거 (드문 작업이라 전체 순회)"""
+    for key in [k for k, v in _token_cache.items() if v[2] == token_id]:
+        _token_cache.pop(key, None)
 
 
 def get_user_tokens(user_id: int) -> list:
@@ -304,7 +473,7 @@ def get_user_tokens(user_id: int) -> list:
                FROM tokens WHERE user_id = ? ORDER BY created_at DESC""",
             (user_id,)
         )
-        return [dict(row) for row in cursor.fetchall()]
+        return cursor.fetchall()
 
 
 def revoke_token(token_id: int, user_id: int) -> bool:
@@ -315,7 +484,10 @@ def revoke_token(token_id: int, user_id: int) -> bool:
             "UPDATE tokens SET is_active = 0 WHERE id = ? AND user_id = ?",
             (token_id, user_id)
         )
-        return cursor.rowcount > 0
+        changed = cursor.rowcount > 0
+    if changed:
+        _purge_token_cache(token_id)
+    return changed
 
 
 def delete_token(token_id: int, user_id: int) -> bool:
@@ -326,7 +498,10 @@ def delete_token(token_id: int, user_id: int) -> bool:
             "DELETE FROM tokens WHERE id = ? AND user_id = ?",
             (token_id, user_id)
         )
-        return cursor.rowcount > 0
+        changed = cursor.rowcount > 0
+    if changed:
+        _purge_token_cache(token_id)
+    return changed
 
 
 # ============ 토큰으로 Credentials 조회 ============
@@ -370,29 +545,29 @@ def verify_code(email: str, code: str, code_type: str = "register", max_attempts
     """인증 코드 확인 (최대 시도 횟수 제한)"""
     with get_connection() as conn:
         cursor = conn.cursor()
+        # 최신 미사용 코드의 시도 횟수 증가와 조회를 한 문장으로 처리 (초과 시 함께 폐기)
         cursor.execute(
-            """SELECT id, code, attempts FROM verification_codes
-               WHERE email = ? AND type = ? AND used = 0
-               AND expires_at > CURRENT_TIMESTAMP
-               ORDER BY created_at DESC LIMIT 1""",
-            (email, code_type)
+            """UPDATE verification_codes
+               SET attempts = attempts + 1,
+                   used = CASE WHEN attempts >= ? THEN 1 ELSE used END
+               WHERE id = (
+                   SELECT id FROM verification_codes
+                   WHERE email = ? AND type = ? AND used = 0
+                   AND expires_at > CURRENT_TIMESTAMP
+                   ORDER BY created_at DESC LIMIT 1
+               )
+               RETURNING id, code, attempts""",
+            (max_attempts, email, code_type)
         )
         row = cursor.fetchone()
 
         if not row:
             return False
 
-        # 시도 횟수 초과 확인
-        if row["attempts"] >= max_attempts:
-            cursor.execute("UPDATE verification_codes SET used = 1 WHERE id = ?", (row["id"],))
+        # 시도 횟수 초과 (RETURNING은 증가 후 값)
+        if row["attempts"] > max_attempts:
             return False
 
-        # 시도 횟수 증가
-        cursor.execute(
-            "UPDATE verification_codes SET attempts = attempts + 1 WHERE id = ?",
-            (row["id"],)
-        )
-
         if secrets.compare_digest(code, row["code"]):
             cursor.execute("UPDATE verification_codes SET used = 1 WHERE id = ?", (row["id"],))
             return True
@@ -416,13 +591,20 @@ def is_email_verified(email: str) -> bool:
         return bool(row and row["email_verified"])
 
 
+def email_exists(email: str) -> bool:
+    """이메일 중복 확인 (행 전체를 읽지 않고 존재 여부만 조회)"""
+    with get_connection() as conn:
+        row = conn.execute("SELECT 1 FROM users WHERE email = ? LIMIT 1", (email,)).fetchone()
+        return row is not None
+
+
 def get_user_by_email(email: str) -> Optional[dict]:
     """이메일로 사용자 조회"""
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT id, email, email_verified, created_at FROM users WHERE email = ?", (email,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return row
 
 
 # ============ 자동화 설정 ============
@@ -430,22 +612,20 @@ def get_user_by_email(email: str) -> Optional[dict]:
 def get_automation_settings(user_id: int) -> Optional[dict]:
     with get_connection() as conn:
         row = conn.execute("SELECT * FROM automation_settings WHERE user_id = ?", (user_id,)).fetchone()
-        return dict(row) if row else None
+        return row
 
 
 def update_automation_settings(user_id: int, enabled: bool, interval_minutes: int = 60):
+    """자동화 설정 저장 (user_id UNIQUE 기준 upsert, 단일 문장)"""
     with get_connection() as conn:
-        existing = conn.execute("SELECT id FROM automation_settings WHERE user_id = ?", (user_id,)).fetchone()
-        if existing:
-            conn.execute(
-                "UPDATE automation_settings SET enabled = ?, interval_minutes = ?, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?",
-                (1 if enabled else 0, interval_minutes, user_id)
-            )
-        else:
-            conn.execute(
-                "INSERT INTO automation_settings (user_id, enabled, interval_minutes) VALUES (?, ?, ?)",
-                (user_id, 1 if enabled else 0, interval_minutes)
-            )
+        conn.execute(
+            """INSERT INTO automation_settings (user_id, enabled, interval_minutes) VALUES (?, ?, ?)
+               ON CONFLICT(user_id) DO UPDATE SET
+                   enabled = excluded.enabled,
+                   interval_minutes = excluded.interval_minutes,
+                   updated_at = CURRENT_TIMESTAMP""",
+            (user_id, 1 if enabled else 0, interval_minutes)
+        )
 
 
 def update_automation_last_run(user_id: int, result_summary: str):
@@ -456,12 +636,16 @@ def update_automation_last_run(user_id: int, result_summary: str):
         )
 
 
-def get_all_enabled_automations() -> list[dict]:
+def get_due_automations() -> list[int]:
+    """실행 주기가 도래한 자동화 사용자 ID 목록 (주기 판정은 SQL에서 처리)"""
     with get_connection() as conn:
-        rows = conn.execute(
-            "SELECT a.*, u.email FROM automation_settings a JOIN users u ON a.user_id = u.id WHERE a.enabled = 1"
-        ).fetchall()
-        return [dict(r) for r in rows]
+        rows = conn.execute("""
+            SELECT user_id FROM automation_settings
+            WHERE enabled = 1
+              AND (last_run_at IS NULL
+                   OR last_run_at <= datetime('now', '-' || COALESCE(interval_minutes, 60) || ' minutes'))
+        """).fetchall()
+        return [r["user_id"] for r in rows]
 
 
 # ============ 처리 로그 ============
@@ -474,13 +658,38 @@ def create_processing_log(user_id: int, trigger_type: str, total: int, processed
         )
 
 
-def get_processing_logs(user_id: int, limit: int = 20) -> list[dict]:
+def record_automation_run(user_id: int, total: int, processed: int, failed: int, result_json: str, result_summary: str):
+    """자동 처리 결과 기록 (처리 로그 INSERT + 마지막 실행 UPDATE를 한 트랜잭션으로)"""
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT INTO processing_logs (user_id, trigger_type, total_orders, processed, failed, result_json) VALUES (?, 'auto', ?, ?, ?, ?)",
+            (user_id, total, processed, failed, result_json)
+        )
+        conn.execute(
+            "UPDATE automation_settings SET last_run_at = CURRENT_TIMESTAMP, last_result = ? WHERE user_id = ?",
+            (result_summary, user_id)
+        )
+
+
+def get_processing_logs(user_id: int, limit: int = 20, before_id: Optional[int] = None) -> list[dict]:
+    """처리 로그 목록 조회 (대시보드 표시용 컬럼만, result_json 제외)
+
+    id 내림차순 keyset 페이지네이션: before_id보다 오래된 로그만 조회 (OFFSET 스캔 없음)
+    """
     with get_connection() as conn:
-        rows = conn.execute(
-            "SELECT * FROM processing_logs WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
-            (user_id, limit)
-        ).fetchall()
-        return [dict(r) for r in rows]
+        if before_id is None:
+            rows = conn.execute(
+                "SELECT id, trigger_type, total_orders, processed, failed, created_at "
+                "FROM processing_logs WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT id, trigger_type, total_orders, processed, failed, created_at "
+                "FROM processing_logs WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                (user_id, before_id, limit)
+            ).fetchall()
+        return rows
 
 
 def migrate_database():
@@ -0,0 +1,36 @@
+"""외부 API 호출용 HTTP 공통 설정"""
+from typing import Optional
+
+import httpx
+
+# 프로세스 전체에서 공유하는 SSL 컨텍스트 (CA 번들 로드/TLS 설정을 한 번만 수행)
+SSL_CONTEXT = httpx.create_ssl_context()
+
+# 재사용 타임아웃 설정 (클라이언트 생성 때마다 Timeout 객체를 새로 만들지 않도록)
+# 커넥션 풀이 가득 차면 30초를 기다리지 않고 5초 안에 PoolTimeout으로 실패
+API_TIMEOUT = httpx.Timeout(30.0, pool=5.0)
+TURNSTILE_TIMEOUT = httpx.Timeout(10.0)
+
+# 커넥션 풀 크기 (쿠팡/CJ가 한 풀을 공유하므로 전체 동시 호출 상한, 유휴 연결은 30초간 유지)
+API_LIMITS = httpx.Limits(max_connections=40, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+# 쿠팡/CJ 클라이언트가 모두 공유하는 HTTP 클라이언트 (사용자별 인스턴스가 늘어도 커넥션 풀은 하나)
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 HTTP 클라이언트 반환 (최초 호출 시 생성)"""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = httpx.AsyncClient(
+            timeout=API_TIMEOUT, limits=API_LIMITS, http2=True, verify=SSL_CONTEXT
+        )
+    return _shared_http_client
+
+
+async def close_http_client():
+    """공유 HTTP 클라이언트 종료 (앱 종료 시 호출)"""
+    global _shared_http_client
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
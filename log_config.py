@@ -0,0 +1,31 @@
+"""structlog 공통 설정"""
+import logging
+import os
+import sys
+
+import orjson
+import structlog
+
+# 로그 레벨 (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+
+def configure_logging():
+    """structlog 설정 (진입점에서 로거를 처음 사용하기 전에 한 번 호출)
+
+    표준 logging을 거치지 않고 orjson으로 직렬화한 바이트를 stderr에 직접 기록.
+    stdio 모드에서는 stdout이 MCP 프로토콜 채널이므로 로그는 stderr로 보냄.
+    """
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True, key="ts"),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=orjson.dumps),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.getLevelNamesMapping().get(LOG_LEVEL, logging.INFO)
+        ),
+        logger_factory=structlog.BytesLoggerFactory(file=sys.stderr.buffer),
+        cache_logger_on_first_use=True,
+    )
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List
 
 
-@dataclass
+@dataclass(slots=True)
 class ShippingRequest:
     """송장 발급 요청"""
     # 발송인 정보
@@ -31,7 +31,7 @@ class ShippingRequest:
     order_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ShippingResponse:
     """송장 발급 응답"""
     success: bool
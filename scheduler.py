@@ -1,29 +1,21 @@
 """백그라운드 스케줄러 - 사용자별 자동 주문 처리"""
-import json
+import asyncio
+import orjson
 import structlog
-from datetime import datetime, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 import database as db
-from auth import UserCredentials, set_credentials, _credentials
+from auth import credentials_from_db_row, set_credentials, _credentials
 
 logger = structlog.get_logger()
 
 scheduler = AsyncIOScheduler()
 
+# 토큰 마지막 사용 시간 일괄 반영 주기
+TOKEN_USAGE_FLUSH_SECONDS = 30
 
-def _build_creds(creds_dict: dict) -> UserCredentials:
-    return UserCredentials(
-        coupang_vendor_id=creds_dict.get("coupang_vendor_id"),
-        coupang_access_key=creds_dict.get("coupang_access_key"),
-        coupang_secret_key=creds_dict.get("coupang_secret_key"),
-        cj_customer_id=creds_dict.get("cj_customer_id"),
-        cj_biz_reg_num=creds_dict.get("cj_biz_reg_num"),
-        sender_name=creds_dict.get("sender_name"),
-        sender_phone=creds_dict.get("sender_phone"),
-        sender_zipcode=creds_dict.get("sender_zipcode"),
-        sender_address=creds_dict.get("sender_address"),
-    )
+# 한 틱에서 동시에 처리하는 사용자 수 (외부 API 커넥션 풀 크기 이내로 유지)
+CRON_CONCURRENCY = 5
 
 
 async def run_cron_for_user(user_id: int):
@@ -34,7 +26,7 @@ async def run_cron_for_user(user_id: int):
     if not creds_dict:
         return
 
-    token = set_credentials(_build_creds(creds_dict))
+    token = set_credentials(credentials_from_db_row(creds_dict))
     try:
         result = await process_orders(days=7, dry_run=False)
 
@@ -43,15 +35,14 @@ async def run_cron_for_user(user_id: int):
         failed = result.get("failed", 0)
         summary = f"성공 {processed}건, 실패 {failed}건" if total > 0 else "신규 주문 없음"
 
-        db.create_processing_log(
+        db.record_automation_run(
             user_id=user_id,
-            trigger_type="auto",
             total=total,
             processed=processed,
             failed=failed,
-            result_json=json.dumps(result, ensure_ascii=False, default=str),
+            result_json=orjson.dumps(result, default=str).decode(),
+            result_summary=summary,
         )
-        db.update_automation_last_run(user_id, summary)
         logger.info("cron.user_processed", user_id=user_id, total=total, processed=processed, failed=failed)
 
     except Exception as e:
@@ -62,41 +53,41 @@ async def run_cron_for_user(user_id: int):
 
 
 async def cron_tick():
-    """매 분 실행: 자동화 활성 사용자 확인 후 처리"""
-    automations = db.get_all_enabled_automations()
-    now = datetime.now(timezone.utc)
-
-    for auto in automations:
-        user_id = auto["user_id"]
-        interval = auto.get("interval_minutes", 60)
-        last_run = auto.get("last_run_at")
-
-        if last_run:
-            try:
-                if isinstance(last_run, str):
-                    last_run_dt = datetime.fromisoformat(last_run.replace("Z", "+00:00"))
-                else:
-                    last_run_dt = last_run
-                if last_run_dt.tzinfo is None:
-                    last_run_dt = last_run_dt.replace(tzinfo=timezone.utc)
-                elapsed = (now - last_run_dt).total_seconds() / 60
-                if elapsed < interval:
-                    continue
-            except Exception as e:
-                logger.warning("cron.bad_last_run", user_id=user_id, error=str(e))
-                continue
-
-        await run_cron_for_user(user_id)
+    """매 분 실행: 실행 주기가 도래한 자동화 사용자 처리 (사용자 간 동시 실행, 동시 처리 수 제한)"""
+    user_ids = db.get_due_automations()
+    if not user_ids:
+        return
+    semaphore = asyncio.Semaphore(CRON_CONCURRENCY)
+
+    async def run(user_id: int):
+        async with semaphore:
+            await run_cron_for_user(user_id)
+
+    # 사용자별 작업은 각자 컨텍스트에서 자격증명을 설정하므로 서로 격리됨
+    await asyncio.gather(*(run(user_id) for user_id in user_ids), return_exceptions=True)
+
+
+def flush_token_usage():
+    """토큰 마지막 사용 시간 일괄 반영"""
+    try:
+        db.flush_token_usage()
+    except Exception as e:
+        logger.warning("token_usage.flush_error", error=str(e))
 
 
 def start_scheduler():
     """스케줄러 시작"""
     scheduler.add_job(cron_tick, "interval", minutes=1, id="cron_tick", replace_existing=True, max_instances=1)
+    scheduler.add_job(
+        flush_token_usage, "interval", seconds=TOKEN_USAGE_FLUSH_SECONDS,
+        id="flush_token_usage", replace_existing=True, max_instances=1,
+    )
     scheduler.start()
     logger.info("scheduler.started")
 
 
 def stop_scheduler():
-    """스케줄러 종료"""
+    """스케줄러 종료 (대기 중인 토큰 사용 기록은 마지막으로 반영)"""
     scheduler.shutdown(wait=False)
+    flush_token_usage()
     logger.info("scheduler.stopped")
@@ -6,6 +6,19 @@
 """
 import argparse
 import asyncio
+import importlib.util
+
+from log_config import configure_logging
+
+
+def install_uvloop() -> bool:
+    """uvloop 이벤트 루프 설치 (미설치/미지원 플랫폼이면 기본 asyncio 루프 사용)"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
 
 def main():
@@ -15,13 +28,19 @@ def main():
     parser.add_argument("--port", type=int, default=8080, help="HTTP 서버 포트")
 
     args = parser.parse_args()
+    configure_logging()
+    has_uvloop = install_uvloop()
 
     if args.http:
         import uvicorn
         from app import app
         print(f"HTTP 모드로 시작: http://{args.host}:{args.port}")
         print(f"API 문서: http://{args.host}:{args.port}/docs")
-        uvicorn.run(app, host=args.host, port=args.port)
+        uvicorn.run(
+            app, host=args.host, port=args.port,
+            loop="uvloop" if has_uvloop else "asyncio",
+            http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        )
     else:
         print("stdio 모드는 로컬 전용입니다. 다중 사용자 지원을 위해 --http 옵션을 사용하세요.")
         asyncio.run(run_stdio())
@@ -30,7 +49,7 @@ def main():
 async def run_stdio():
     """stdio 모드 실행 (로컬 전용)"""
     import os
-    import json
+    import orjson
     from typing import Any
 
     from mcp.server import Server
@@ -157,12 +176,12 @@ async def run_stdio():
 
             return [TextContent(
                 type="text",
-                text=json.dumps(result, ensure_ascii=False, default=str, indent=2)
+                text=orjson.dumps(result, default=str, option=orjson.OPT_INDENT_2).decode()
             )]
         except Exception as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({"error": str(e)}, ensure_ascii=False)
+                text=orjson.dumps({"error": str(e)}).decode()
             )]
 
     async with stdio_server() as (read_stream, write_stream):
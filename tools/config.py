@@ -3,6 +3,38 @@ from typing import Any
 
 from auth import get_credentials
 
+# 연동별 상태 메시지 (설정 여부에 따라 고정이므로 모듈 상수로 유지, 읽기 전용)
+_COUPANG_STATUS = {
+    True: {
+        "configured": True,
+        "message": "쿠팡 API가 설정되어 있습니다. 주문 조회 및 송장 등록이 가능합니다.",
+    },
+    False: {
+        "configured": False,
+        "message": "쿠팡 API 키가 설정되지 않았습니다. COUPANG_VENDOR_ID, COUPANG_ACCESS_KEY, COUPANG_SECRET_KEY를 설정해주세요.",
+    },
+}
+_CJ_STATUS = {
+    True: {
+        "configured": True,
+        "message": "CJ대한통운이 설정되어 있습니다. 송장 발급이 가능합니다.",
+    },
+    False: {
+        "configured": False,
+        "message": "CJ대한통운 고객정보가 설정되지 않았습니다. CJ_CUSTOMER_ID, CJ_BIZ_REG_NUM을 설정해주세요. 미설정 시 테스트 모드로 동작합니다.",
+    },
+}
+_SENDER_STATUS = {
+    True: {
+        "configured": True,
+        "message": "발송인 정보가 설정되어 있습니다.",
+    },
+    False: {
+        "configured": False,
+        "message": "발송인 정보가 설정되지 않았습니다. SENDER_NAME, SENDER_PHONE, SENDER_ADDRESS를 설정해주세요.",
+    },
+}
+
 
 async def check_config() -> dict[str, Any]:
     """현재 설정 상태를 확인합니다."""
@@ -17,43 +49,19 @@ async def check_config() -> dict[str, Any]:
             "sender_configured": False,
         }
 
-    result: dict[str, Any] = {"configured": True, "integrations": {}}
-
-    if creds.coupang_configured:
-        result["integrations"]["coupang"] = {
-            "configured": True,
-            "message": "쿠팡 API가 설정되어 있습니다. 주문 조회 및 송장 등록이 가능합니다.",
-        }
-    else:
-        result["integrations"]["coupang"] = {
-            "configured": False,
-            "message": "쿠팡 API 키가 설정되지 않았습니다. COUPANG_VENDOR_ID, COUPANG_ACCESS_KEY, COUPANG_SECRET_KEY를 설정해주세요.",
-        }
-
-    if creds.cj_configured:
-        result["integrations"]["cj"] = {
-            "configured": True,
-            "message": "CJ대한통운이 설정되어 있습니다. 송장 발급이 가능합니다.",
-        }
-    else:
-        result["integrations"]["cj"] = {
-            "configured": False,
-            "message": "CJ대한통운 고객정보가 설정되지 않았습니다. CJ_CUSTOMER_ID, CJ_BIZ_REG_NUM을 설정해주세요. 미설정 시 테스트 모드로 동작합니다.",
-        }
-
-    if creds.sender_configured:
-        result["integrations"]["sender"] = {
-            "configured": True,
-            "message": "발송인 정보가 설정되어 있습니다.",
-        }
-    else:
-        result["integrations"]["sender"] = {
-            "configured": False,
-            "message": "발송인 정보가 설정되지 않았습니다. SENDER_NAME, SENDER_PHONE, SENDER_ADDRESS를 설정해주세요.",
-        }
-
-    result["coupang_configured"] = creds.coupang_configured
-    result["cj_configured"] = creds.cj_configured
-    result["sender_configured"] = creds.sender_configured
+    # 설정 여부는 한 번만 계산
+    coupang_configured = creds.coupang_configured
+    cj_configured = creds.cj_configured
+    sender_configured = creds.sender_configured
 
-    return result
+    return {
+        "configured": True,
+        "integrations": {
+            "coupang": _COUPANG_STATUS[coupang_configured],
+            "cj": _CJ_STATUS[cj_configured],
+            "sender": _SENDER_STATUS[sender_configured],
+        },
+        "coupang_configured": coupang_configured,
+        "cj_configured": cj_configured,
+        "sender_configured": sender_configured,
+    }
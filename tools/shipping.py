@@ -1,17 +1,48 @@
 """송장 발급/등록 MCP Tools - MVP (CJ대한통운 + 쿠팡)"""
+import asyncio
 import os
 from collections import defaultdict
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
-from auth import get_credentials
+from auth import UserCredentials, get_credentials
 from models import ShippingRequest
-from carriers.cj import CJClient
+
+if TYPE_CHECKING:
+    from carriers.cj import CJClient
 
 # CJ 개발기 테스트 모드 (CJ_TEST_MODE=true 설정 시 개발 URL 사용)
 CJ_TEST_MODE = os.environ.get("CJ_TEST_MODE", "").lower() in ("true", "1", "yes")
 
+# 상품 정보가 없는 주문의 기본 아이템
+_DEFAULT_ITEMS = ({"product_name": "상품", "shippingCount": 1},)
+
+# process_orders 그룹 동시 처리 수
+PROCESS_CONCURRENCY = 5
+
 # CJClient 인스턴스 캐시 (고객ID+사업자번호 조합 키, 토큰 24시간 캐싱 활용)
-_cj_clients: dict[tuple[str, str], CJClient] = {}
+_cj_clients: dict[tuple[str, str], "CJClient"] = {}
+
+
+def _get_cj_client(creds: Optional[UserCredentials]) -> "CJClient":
+    """사용자 자격증명에 맞는 CJClient 반환 (CJ 모듈은 첫 발급 시 로드)"""
+    from carriers.cj import CJClient
+
+    customer_id = (creds.cj_customer_id or "") if creds else ""
+    biz_reg_num = (creds.cj_biz_reg_num or "") if creds else ""
+
+    # 자격증명 없는 테스트 모드는 캐시하지 않음 (사용자 간 격리)
+    if not (customer_id and biz_reg_num):
+        return CJClient(customer_id="", biz_reg_num="", test_mode=True)
+
+    cache_key = (customer_id, biz_reg_num)
+    client = _cj_clients.get(cache_key)
+    if client is None:
+        client = _cj_clients[cache_key] = CJClient(
+            customer_id=customer_id,
+            biz_reg_num=biz_reg_num,
+            test_mode=CJ_TEST_MODE,
+        )
+    return client
 
 
 async def issue_invoice(
@@ -30,22 +61,7 @@ async def issue_invoice(
     if not creds.sender_configured:
         return {"success": False, "error": "발송인 정보가 설정되지 않았습니다. https://soloseller.cloud/settings 에서 등록해주세요."}
 
-    customer_id = creds.cj_customer_id or ""
-    biz_reg_num = creds.cj_biz_reg_num or ""
-    has_real_creds = bool(customer_id and biz_reg_num)
-    cache_key = (customer_id, biz_reg_num)
-
-    # 자격증명 없는 테스트 모드는 캐시하지 않음 (사용자 간 격리)
-    if not has_real_creds:
-        client = CJClient(customer_id="", biz_reg_num="", test_mode=True)
-    else:
-        if cache_key not in _cj_clients:
-            _cj_clients[cache_key] = CJClient(
-                customer_id=customer_id,
-                biz_reg_num=biz_reg_num,
-                test_mode=CJ_TEST_MODE,
-            )
-        client = _cj_clients[cache_key]
+    client = _get_cj_client(creds)
 
     request = ShippingRequest(
         sender_name=creds.sender_name,
@@ -64,7 +80,7 @@ async def issue_invoice(
     result = {
         "success": response.success,
         "tracking_number": response.tracking_number,
-        "carrier": "CJ대한통운",
+        "carrier": client.carrier_name,
         "error": response.error,
         "routing_code": response.routing_code or "",
         "branch_name": response.branch_name or "",
@@ -87,26 +103,24 @@ async def register_invoice(
         return {"success": False, "error": "쿠팡 API 키가 설정되지 않았습니다. https://soloseller.cloud/settings 에서 등록해주세요."}
 
     from channels.coupang import CoupangClient
+    from carriers.cj import CJClient
     client = CoupangClient(
         vendor_id=creds.coupang_vendor_id,
         access_key=creds.coupang_access_key,
         secret_key=creds.coupang_secret_key
     )
-    try:
-        success = await client.register_invoice(
-            order_id=order_id,
-            tracking_number=tracking_number,
-            carrier_code="CJGLS"
-        )
+    success = await client.register_invoice(
+        order_id=order_id,
+        tracking_number=tracking_number,
+        carrier_code=CJClient.carrier_code
+    )
 
-        return {
-            "success": success,
-            "message": "쿠팡에 송장 등록 완료" if success else "쿠팡 송장 등록 실패",
-            "order_id": order_id,
-            "tracking_number": tracking_number
-        }
-    finally:
-        await client.http_client.aclose()
+    return {
+        "success": success,
+        "message": "쿠팡에 송장 등록 완료" if success else "쿠팡 송장 등록 실패",
+        "order_id": order_id,
+        "tracking_number": tracking_number
+    }
 
 
 async def process_orders(days: int = 7, dry_run: bool = False) -> dict[str, Any]:
@@ -131,31 +145,28 @@ async def process_orders(days: int = 7, dry_run: bool = False) -> dict[str, Any]
         key = (name, addr, phone)
         groups[key].append(order)
 
+    consolidated_groups = sum(1 for g in groups.values() if len(g) > 1)
+
     # dry_run: 미리보기 (합포장 그룹 표시)
     if dry_run:
         preview = []
-        for (recv_name, _), group_orders in groups.items():
+        for group_orders in groups.values():
+            group_ids = [o.get("order_id") for o in group_orders] if len(group_orders) > 1 else None
             for order in group_orders:
-                items = order.get("items", [])
-                product_summary = ", ".join(
-                    item.get("product_name", "상품") for item in items
-                ) if items else "상품"
+                items = order.get("items")
+                order_id = order.get("order_id")
                 entry = {
-                    "order_id": order.get("order_id"),
+                    "order_id": order_id,
                     "receiver_name": order.get("receiver_name"),
-                    "product_summary": product_summary,
+                    "product_summary": ", ".join([item.get("product_name", "상품") for item in items]) if items else "상품",
                 }
-                if len(group_orders) > 1:
-                    entry["consolidated_with"] = [
-                        o.get("order_id") for o in group_orders
-                        if o.get("order_id") != order.get("order_id")
-                    ]
+                if group_ids:
+                    entry["consolidated_with"] = [oid for oid in group_ids if oid != order_id]
                 preview.append(entry)
 
-        consolidated_count = sum(1 for g in groups.values() if len(g) > 1)
         msg = f"{len(orders)}건의 주문이 처리 대기 중입니다."
-        if consolidated_count:
-            msg += f" ({consolidated_count}개 합포장 그룹 포함)"
+        if consolidated_groups:
+            msg += f" ({consolidated_groups}개 합포장 그룹 포함)"
 
         return {
             "success": True,
@@ -177,138 +188,21 @@ async def process_orders(days: int = 7, dry_run: bool = False) -> dict[str, Any]
         "sender_zipcode": creds.sender_zipcode if creds else "",
     }
 
-    for (_recv_name, _recv_addr, _recv_phone), group_orders in groups.items():
-        if len(group_orders) == 1:
-            # 단건 처리 (기존 로직)
-            order = group_orders[0]
-            order_id = order.get("order_id", "")
-            receiver = order.get("receiver_name", "")
-            phone = order.get("receiver_phone", "")
-            address = order.get("receiver_address", "")
-            zipcode = order.get("receiver_zipcode", "")
-            items = order.get("items", [])
-            product = items[0].get("product_name", "상품") if items else "상품"
-
-            invoice_result = await issue_invoice(
-                order_id=order_id,
-                receiver_name=receiver,
-                receiver_phone=phone,
-                receiver_address=address,
-                receiver_zipcode=zipcode,
-                product_name=product
-            )
-
-            if not invoice_result.get("success"):
-                results.append({"order_id": order_id, "status": "발급실패", **invoice_result})
-                failed += 1
-                continue
-
-            tracking = invoice_result.get("tracking_number", "")
-            is_test = "warning" in invoice_result
-            label_data = {
-                "receiver_name": receiver, "receiver_phone": phone,
-                "receiver_address": address, "receiver_zipcode": zipcode,
-                "product_name": product, **sender_data,
-                "routing_code": invoice_result.get("routing_code", ""),
-                "branch_name": invoice_result.get("branch_name", ""),
-            }
-
-            if is_test:
-                results.append({"order_id": order_id, "status": "테스트", "tracking_number": tracking, "warning": "테스트 모드 - 쿠팡 등록 생략", **label_data})
-                processed += 1
-                continue
-
-            reg_result = await register_invoice(order_id=order_id, tracking_number=tracking)
-            if reg_result.get("success"):
-                results.append({"order_id": order_id, "status": "완료", "tracking_number": tracking, **label_data})
-                processed += 1
-            else:
-                results.append({"order_id": order_id, "status": "등록실패", "tracking_number": tracking, "error": reg_result.get("error"), **label_data})
-                failed += 1
-        else:
-            # 합포장 처리: 같은 수령인의 여러 주문을 하나의 운송장으로
-            order_ids = [o.get("order_id", "") for o in group_orders]
-            first_order = group_orders[0]
-            receiver = first_order.get("receiver_name", "")
-            phone = first_order.get("receiver_phone", "")
-            address = first_order.get("receiver_address", "")
-            zipcode = first_order.get("receiver_zipcode", "")
-
-            # ShippingRequest 목록 생성 (주문 내 모든 아이템 포함)
-            shipping_requests = []
-            product_names = []
-            for order in group_orders:
-                items = order.get("items", [])
-                if not items:
-                    items = [{"product_name": "상품", "shippingCount": 1}]
-                for item in items:
-                    pname = item.get("product_name", "상품")
-                    qty = item.get("shippingCount", 1) or 1
-                    product_names.append(pname)
-                    shipping_requests.append(ShippingRequest(
-                        sender_name=creds.sender_name if creds else "",
-                        sender_phone=creds.sender_phone if creds else "",
-                        sender_address=creds.sender_address if creds else "",
-                        sender_zipcode=creds.sender_zipcode if creds else "",
-                        receiver_name=receiver,
-                        receiver_phone=phone,
-                        receiver_address=address,
-                        receiver_zipcode=zipcode,
-                        product_name=pname,
-                        quantity=qty,
-                        order_id=order.get("order_id", ""),
-                    ))
-
-            # CJ 클라이언트로 합포장 발급
-            customer_id = creds.cj_customer_id or "" if creds else ""
-            biz_reg_num = creds.cj_biz_reg_num or "" if creds else ""
-            has_real_creds = bool(customer_id and biz_reg_num)
-            cache_key = (customer_id, biz_reg_num)
-
-            if not has_real_creds:
-                client = CJClient(customer_id="", biz_reg_num="", test_mode=True)
-            else:
-                if cache_key not in _cj_clients:
-                    _cj_clients[cache_key] = CJClient(
-                        customer_id=customer_id, biz_reg_num=biz_reg_num, test_mode=CJ_TEST_MODE,
-                    )
-                client = _cj_clients[cache_key]
-
-            response = await client.request_consolidated_invoice(shipping_requests)
-
-            if not response.success:
-                for oid in order_ids:
-                    results.append({"order_id": oid, "status": "합포장발급실패", "error": response.error})
-                    failed += 1
-                continue
-
-            tracking = response.tracking_number or ""
-            is_test = response.is_test
-            product_summary = ", ".join(product_names)
-            label_data = {
-                "receiver_name": receiver, "receiver_phone": phone,
-                "receiver_address": address, "receiver_zipcode": zipcode,
-                "product_name": product_summary, **sender_data,
-                "routing_code": response.routing_code or "",
-                "branch_name": response.branch_name or "",
-            }
-
-            # 각 주문에 대해 쿠팡에 동일 송장 등록
-            for oid in order_ids:
-                if is_test:
-                    results.append({"order_id": oid, "status": "테스트(합포장)", "tracking_number": tracking, "consolidated_orders": order_ids, "warning": "테스트 모드 - 쿠팡 등록 생략", **label_data})
-                    processed += 1
-                    continue
-
-                reg_result = await register_invoice(order_id=oid, tracking_number=tracking)
-                if reg_result.get("success"):
-                    results.append({"order_id": oid, "status": "완료(합포장)", "tracking_number": tracking, "consolidated_orders": order_ids, **label_data})
-                    processed += 1
-                else:
-                    results.append({"order_id": oid, "status": "등록실패(합포장)", "tracking_number": tracking, "consolidated_orders": order_ids, "error": reg_result.get("error"), **label_data})
-                    failed += 1
+    # 그룹별 처리는 동시에 실행 (외부 API 동시 호출 수 제한), 결과는 그룹 순서 유지
+    semaphore = asyncio.Semaphore(PROCESS_CONCURRENCY)
+
+    async def run_group(group_orders: list[dict]) -> tuple[list[dict], int, int]:
+        async with semaphore:
+            if len(group_orders) == 1:
+                return await _process_single_order(group_orders[0], sender_data)
+            return await _process_consolidated_group(group_orders, creds, sender_data)
+
+    group_results = await asyncio.gather(*(run_group(g) for g in groups.values()))
+    for group_result, group_processed, group_failed in group_results:
+        results.extend(group_result)
+        processed += group_processed
+        failed += group_failed
 
-    consolidated_groups = sum(1 for g in groups.values() if len(g) > 1)
     return {
         "success": failed == 0,
         "total": len(orders),
@@ -317,3 +211,117 @@ async def process_orders(days: int = 7, dry_run: bool = False) -> dict[str, Any]
         "consolidated_groups": consolidated_groups,
         "results": results
     }
+
+
+async def _process_single_order(order: dict, sender_data: dict) -> tuple[list[dict], int, int]:
+    """단건 주문 송장 발급 + 쿠팡 등록 → (결과 목록, 성공 수, 실패 수)"""
+    order_id = order.get("order_id", "")
+    receiver = order.get("receiver_name", "")
+    phone = order.get("receiver_phone", "")
+    address = order.get("receiver_address", "")
+    zipcode = order.get("receiver_zipcode", "")
+    items = order.get("items", [])
+    product = items[0].get("product_name", "상품") if items else "상품"
+
+    invoice_result = await issue_invoice(
+        order_id=order_id,
+        receiver_name=receiver,
+        receiver_phone=phone,
+        receiver_address=address,
+        receiver_zipcode=zipcode,
+        product_name=product
+    )
+
+    if not invoice_result.get("success"):
+        return [{"order_id": order_id, "status": "발급실패", **invoice_result}], 0, 1
+
+    tracking = invoice_result.get("tracking_number", "")
+    is_test = "warning" in invoice_result
+    label_data = {
+        "receiver_name": receiver, "receiver_phone": phone,
+        "receiver_address": address, "receiver_zipcode": zipcode,
+        "product_name": product, **sender_data,
+        "routing_code": invoice_result.get("routing_code", ""),
+        "branch_name": invoice_result.get("branch_name", ""),
+    }
+
+    if is_test:
+        return [{"order_id": order_id, "status": "테스트", "tracking_number": tracking, "warning": "테스트 모드 - 쿠팡 등록 생략", **label_data}], 1, 0
+
+    reg_result = await register_invoice(order_id=order_id, tracking_number=tracking)
+    if reg_result.get("success"):
+        return [{"order_id": order_id, "status": "완료", "tracking_number": tracking, **label_data}], 1, 0
+    return [{"order_id": order_id, "status": "등록실패", "tracking_number": tracking, "error": reg_result.get("error"), **label_data}], 0, 1
+
+
+async def _process_consolidated_group(
+    group_orders: list[dict], creds: Optional[UserCredentials], sender_data: dict
+) -> tuple[list[dict], int, int]:
+    """합포장 그룹 (같은 수령인의 여러 주문을 하나의 운송장으로) → (결과 목록, 성공 수, 실패 수)"""
+    order_ids = [o.get("order_id", "") for o in group_orders]
+    first_order = group_orders[0]
+    receiver = first_order.get("receiver_name", "")
+    phone = first_order.get("receiver_phone", "")
+    address = first_order.get("receiver_address", "")
+    zipcode = first_order.get("receiver_zipcode", "")
+
+    # ShippingRequest 목록 생성 (주문 내 모든 아이템 포함, 그룹 공통 필드는 한 번만 구성)
+    common = {
+        **sender_data,
+        "receiver_name": receiver,
+        "receiver_phone": phone,
+        "receiver_address": address,
+        "receiver_zipcode": zipcode,
+    }
+    shipping_requests = []
+    product_names = []
+    for order in group_orders:
+        order_id = order.get("order_id", "")
+        for item in order.get("items") or _DEFAULT_ITEMS:
+            pname = item.get("product_name", "상품")
+            product_names.append(pname)
+            shipping_requests.append(ShippingRequest(
+                **common,
+                product_name=pname,
+                quantity=item.get("shippingCount", 1) or 1,
+                order_id=order_id,
+            ))
+
+    # CJ 클라이언트로 합포장 발급
+    client = _get_cj_client(creds)
+    response = await client.request_consolidated_invoice(shipping_requests)
+
+    if not response.success:
+        return [{"order_id": oid, "status": "합포장발급실패", "error": response.error} for oid in order_ids], 0, len(order_ids)
+
+    tracking = response.tracking_number or ""
+    is_test = response.is_test
+    product_summary = ", ".join(product_names)
+    label_data = {
+        "receiver_name": receiver, "receiver_phone": phone,
+        "receiver_address": address, "receiver_zipcode": zipcode,
+        "product_name": product_summary, **sender_data,
+        "routing_code": response.routing_code or "",
+        "branch_name": response.branch_name or "",
+    }
+
+    if is_test:
+        results = [
+            {"order_id": oid, "status": "테스트(합포장)", "tracking_number": tracking, "consolidated_orders": order_ids, "warning": "테스트 모드 - 쿠팡 등록 생략", **label_data}
+            for oid in order_ids
+        ]
+        return results, len(order_ids), 0
+
+    # 각 주문에 대해 쿠팡에 동일 송장 등록 (주문별 등록은 서로 독립이라 동시 호출)
+    reg_results = await asyncio.gather(
+        *(register_invoice(order_id=oid, tracking_number=tracking) for oid in order_ids)
+    )
+    results = []
+    processed = 0
+    for oid, reg_result in zip(order_ids, reg_results):
+        if reg_result.get("success"):
+            results.append({"order_id": oid, "status": "완료(합포장)", "tracking_number": tracking, "consolidated_orders": order_ids, **label_data})
+            processed += 1
+        else:
+            results.append({"order_id": oid, "status": "등록실패(합포장)", "tracking_number": tracking, "consolidated_orders": order_ids, "error": reg_result.get("error"), **label_data})
+    return results, processed, len(order_ids) - processed